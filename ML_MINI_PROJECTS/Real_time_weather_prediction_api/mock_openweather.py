@@ -0,0 +1,114 @@
+"""
+Local stand-in for the two OpenWeatherMap endpoints the app uses, for offline testing
+of latency and failure handling.
+
+    GET /geo/1.0/direct?q=<city>&limit=1&appid=...
+    GET /data/2.5/forecast?lat=..&lon=..&units=metric&appid=...
+
+Answers are deterministic per city / coordinates (40 three-hourly steps, like the real
+API). --latency-ms / --jitter-ms delay every response, --fail-rate answers that share of
+requests with 503 + Retry-After, --unknown makes every geocode lookup come back empty.
+
+    python mock_openweather.py --port 8081 --latency-ms 150 --jitter-ms 50 --fail-rate 0.1
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081 streamlit run weather_prediction_api.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = [("Clear", "clear sky", "01d"), ("Clouds", "scattered clouds", "03d"),
+              ("Rain", "light rain", "10d"), ("Drizzle", "drizzle", "09d"),
+              ("Snow", "light snow", "13d"), ("Mist", "mist", "50d")]
+
+
+def _seed(*parts):
+    return int.from_bytes(hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest(), "big")
+
+
+def fake_geocode(city):
+    rng = random.Random(_seed(city.strip().lower()))
+    return [{"name": city.strip().title(), "lat": round(rng.uniform(-60, 70), 4),
+             "lon": round(rng.uniform(-180, 180), 4), "country": "XX"}]
+
+
+def fake_forecast(lat, lon, steps=40):
+    rng = random.Random(_seed(round(lat, 2), round(lon, 2)))
+    base = 30 - abs(lat) * 0.5
+    start = int(time.time()) // 10800 * 10800
+    items = []
+    for i in range(steps):
+        temp = base + 6 * math.sin(2 * math.pi * (i % 8) / 8) + rng.gauss(0, 1.5)
+        main, description, icon = rng.choice(CONDITIONS)
+        items.append({
+            "dt": start + i * 10800,
+            "main": {"temp": round(temp, 2), "feels_like": round(temp - rng.uniform(0, 3), 2),
+                     "humidity": rng.randint(30, 95), "pressure": rng.randint(995, 1030)},
+            "weather": [{"main": main, "description": description, "icon": icon}],
+            "wind": {"speed": round(rng.uniform(0, 12), 2)},
+            "pop": round(rng.random(), 2),
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 10800)),
+        })
+    return {"cod": "200", "cnt": steps, "list": items,
+            "city": {"coord": {"lat": lat, "lon": lon}, "timezone": 0}}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive, like the real API
+    config = None
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        cfg = self.config
+        time.sleep(max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000)
+        if random.random() < cfg.fail_rate:
+            return self._send(503, {"cod": 503, "message": "mock overload"}, {"Retry-After": "1"})
+
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if "appid" not in query:
+            return self._send(401, {"cod": 401, "message": "Invalid API key."})
+        if url.path == "/geo/1.0/direct":
+            return self._send(200, [] if cfg.unknown else fake_geocode(query.get("q", "")))
+        if url.path == "/data/2.5/forecast":
+            try:
+                return self._send(200, fake_forecast(float(query["lat"]), float(query["lon"])))
+            except (KeyError, ValueError):
+                return self._send(400, {"cod": "400", "message": "wrong latitude / longitude"})
+        return self._send(404, {"cod": "404", "message": "not found"})
+
+    def log_message(self, fmt, *args):
+        if not self.config.quiet:
+            super().log_message(fmt, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenWeatherMap server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--unknown", action="store_true", help="geocoding never finds anything")
+    parser.add_argument("--quiet", action="store_true")
+    MockHandler.config = parser.parse_args()
+    server = ThreadingHTTPServer((MockHandler.config.host, MockHandler.config.port), MockHandler)
+    print(f"Mock OpenWeatherMap on http://{MockHandler.config.host}:{MockHandler.config.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
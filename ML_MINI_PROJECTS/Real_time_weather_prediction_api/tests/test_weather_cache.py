@@ -0,0 +1,149 @@
+import threading
+import time
+
+from weather_cache import CachedWeatherClient, PersistentSWRCache, SWRCache, normalize_place
+
+
+class Loader:
+    def __init__(self, value="v", delay=0.0):
+        self.value, self.delay, self.calls = value, delay, 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_normalize_place():
+    assert normalize_place("  new   York,US ") == "new york, us"
+
+
+def test_fresh_entries_are_hits():
+    cache, loader = SWRCache(ttl=60, stale_ttl=60, max_entries=10), Loader()
+    assert cache.get("k", loader) == "v"
+    assert cache.get("k", loader) == "v"
+    assert loader.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = SWRCache(ttl=0.05, stale_ttl=60, max_entries=10)
+    cache.get("k", Loader("old"))
+    time.sleep(0.1)
+    refresh = Loader("new")
+    assert cache.get("k", refresh) == "old"
+    assert wait_for(lambda: cache.get("k", refresh) == "new")
+    assert refresh.calls == 1 and cache.stale_hits >= 1
+
+
+def test_expired_entry_is_reloaded():
+    cache = SWRCache(ttl=0.05, stale_ttl=0, max_entries=10)
+    cache.get("k", Loader("old"))
+    time.sleep(0.1)
+    assert cache.get("k", Loader("new")) == "new"
+
+
+def test_concurrent_misses_share_one_load():
+    cache, loader = SWRCache(ttl=60, stale_ttl=60, max_entries=10), Loader(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["v"] * 8
+    assert loader.calls == 1
+
+
+def test_failed_load_is_not_cached():
+    cache = SWRCache(ttl=60, stale_ttl=60, max_entries=10)
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    try:
+        cache.get("k", fail)
+    except RuntimeError:
+        pass
+    assert cache.get("k", Loader("v")) == "v"
+
+
+def test_least_recently_used_goes_first():
+    cache = SWRCache(ttl=60, stale_ttl=60, max_entries=2)
+    cache.get("a", Loader())
+    cache.get("b", Loader())
+    cache.get("a", Loader())
+    cache.get("c", Loader())
+    reload_b, reload_a = Loader(), Loader()
+    cache.get("a", reload_a)
+    cache.get("b", reload_b)
+    assert (reload_a.calls, reload_b.calls) == (0, 1)
+
+
+def test_negative_entries_expire_quickly():
+    cache = SWRCache(ttl=60, stale_ttl=60, max_entries=10, is_negative=lambda v: v is False, negative_ttl=0.05)
+    cache.get("missing", Loader(False))
+    cache.get("found", Loader(True))
+    time.sleep(0.1)
+    missing, found = Loader(True), Loader(True)
+    assert cache.get("missing", missing) is True          # reloaded at once, no stale answer
+    assert cache.get("found", found) is True
+    assert (missing.calls, found.calls) == (1, 0)
+
+
+def test_persistent_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "geo.db")
+    PersistentSWRCache(path, 60, 60, 10).get("paris", Loader({"lat": 48.85}))
+    reopened, loader = PersistentSWRCache(path, 60, 60, 10), Loader()
+    assert reopened.get("paris", loader) == {"lat": 48.85}
+    assert loader.calls == 0 and len(reopened) == 1
+
+
+def test_persistent_cache_evicts_least_recently_used(tmp_path):
+    cache = PersistentSWRCache(str(tmp_path / "geo.db"), 60, 60, 2)
+    cache.get("a", Loader())
+    cache.get("b", Loader())
+    time.sleep(0.01)
+    cache.get("a", Loader())            # access time noted in memory, written with the next insert
+    cache.get("c", Loader())
+    reload_a, reload_b = Loader(), Loader()
+    cache.get("a", reload_a)
+    cache.get("b", reload_b)
+    assert (reload_a.calls, reload_b.calls) == (0, 1)
+
+
+class FakeClient:
+    def __init__(self):
+        self.geocodes = 0
+
+    def geocode(self, city):
+        self.geocodes += 1
+        return None if city.startswith("Xx") else {"name": city, "lat": 1.0, "lon": 2.0, "country": "XX"}
+
+    def forecast(self, lat, lon):
+        return {"list": [], "lat": lat, "lon": lon}
+
+    def stats(self):
+        return {}
+
+
+def test_not_found_geocodes_use_the_short_ttl(tmp_path):
+    upstream = FakeClient()
+    client = CachedWeatherClient(upstream, geocode_path=str(tmp_path / "geo.db"), not_found_ttl=0.05)
+    assert client.geocode("Xxparis") is None
+    assert client.geocode("xxParis ") is None
+    assert client.geocode("Paris, FR")["name"] == "Paris, FR"
+    assert upstream.geocodes == 2
+    time.sleep(0.1)
+    client.geocode("Xxparis")
+    client.geocode("paris,fr")
+    assert upstream.geocodes == 3
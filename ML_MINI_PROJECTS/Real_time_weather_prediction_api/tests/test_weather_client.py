@@ -0,0 +1,116 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+import weather_client
+from weather_client import WeatherAPIError, WeatherClient, retry_after_seconds
+
+
+class Response:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code, self._body, self.headers = status, body, headers or {}
+
+    def json(self):
+        return self._body
+
+
+class ScriptedSession:
+    """Stands in for requests.Session: answers get() from a list of responses / exceptions."""
+
+    def __init__(self, script):
+        self.script, self.calls = list(script), []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append({"url": url, "params": dict(params), "timeout": timeout})
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(weather_client.time, "sleep", slept.append)
+    return slept
+
+
+def client_with(script, **kwargs):
+    client = WeatherClient(base_url="http://mock", api_key="key", **kwargs)
+    client.session = ScriptedSession(script)
+    return client
+
+
+def test_success_sends_key_and_timeout(sleeps):
+    client = client_with([Response(200, [{"name": "Paris", "lat": 48.8, "lon": 2.3}])], timeout=(1, 2))
+    assert client.geocode("Paris") == {"name": "Paris", "lat": 48.8, "lon": 2.3, "country": None}
+    call = client.session.calls[0]
+    assert call["url"] == "http://mock/geo/1.0/direct"
+    assert call["params"]["appid"] == "key" and call["timeout"] == (1, 2)
+    assert sleeps == [] and client.stats() == {"calls": 1, "retries": 0, "failures": 0}
+
+
+def test_transient_failures_are_retried(sleeps):
+    client = client_with([requests.ConnectionError(), requests.Timeout(), Response(503), Response(200, [])],
+                         retries=3)
+    assert client.geocode("Nowhere") is None
+    assert len(client.session.calls) == 4 and len(sleeps) == 3
+    assert client.stats() == {"calls": 1, "retries": 3, "failures": 0}
+
+
+def test_gives_up_after_the_last_retry(sleeps):
+    client = client_with([Response(500)] * 3, retries=2)
+    with pytest.raises(WeatherAPIError) as e:
+        client.forecast(1.0, 2.0)
+    assert e.value.status == 500
+    assert len(client.session.calls) == 3 and client.failed == 1
+
+
+def test_unreachable_after_the_last_retry(sleeps):
+    client = client_with([requests.ConnectionError()] * 2, retries=1)
+    with pytest.raises(WeatherAPIError, match="unreachable"):
+        client.forecast(1.0, 2.0)
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_client_errors_are_not_retried(sleeps, status):
+    client = client_with([Response(status)])
+    with pytest.raises(WeatherAPIError):
+        client.geocode("Paris")
+    assert len(client.session.calls) == 1 and sleeps == []
+
+
+def test_backoff_is_jittered_and_capped(sleeps):
+    client = client_with([Response(502)] * 7 + [Response(200, [])], retries=7, backoff=1.0, max_backoff=2.5)
+    client.geocode("Paris")
+    assert len(sleeps) == 7
+    assert all(0 <= s <= 2.5 for s in sleeps)
+    assert len(set(sleeps)) > 1                     # full jitter, not a fixed delay
+
+
+def test_retry_after_seconds_is_respected(sleeps):
+    client = client_with([Response(429, headers={"Retry-After": "2"}), Response(200, [])], max_backoff=4.0)
+    client.geocode("Paris")
+    assert sleeps == [2.0]
+
+
+def test_retry_after_is_capped_by_max_backoff(sleeps):
+    client = client_with([Response(503, headers={"Retry-After": "120"}), Response(200, [])], max_backoff=4.0)
+    client.geocode("Paris")
+    assert sleeps == [4.0]
+
+
+def test_retry_after_http_date_is_respected(sleeps):
+    header = formatdate(time.time() + 3, usegmt=True)
+    client = client_with([Response(503, headers={"Retry-After": header}), Response(200, [])], max_backoff=10.0)
+    client.geocode("Paris")
+    assert 1.0 <= sleeps[0] <= 3.0
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("5") == 5.0
+    assert retry_after_seconds(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from weather_dashboard import combined_frame, parse_cities, summary_table
+
+
+def test_commas_stay_inside_a_city():
+    assert parse_cities("Paris, FR\nLondon; Tokyo, JP") == ["Paris, FR", "London", "Tokyo, JP"]
+
+
+def test_duplicates_ignore_case_and_spacing():
+    assert parse_cities("paris,fr\n  Paris ,  FR ;\n\nLONDON;london") == ["paris,fr", "LONDON"]
+
+
+def forecast(temp):
+    return {"list": [{"dt": 0, "main": {"temp": temp, "feels_like": temp, "humidity": 50},
+                      "wind": {"speed": 1.0}, "pop": 0.2, "weather": [{"main": "Clear"}]}]}
+
+
+def test_inputs_resolving_to_one_name_stay_apart():
+    paris = {"name": "Paris", "lat": 0.0, "lon": 0.0}
+    results = {"Paris, FR": (paris, forecast(20.0), 0.1), "Paris, US": (paris, forecast(30.0), 0.1)}
+    table = summary_table(combined_frame(results))
+    assert list(table.index) == ["Paris, FR", "Paris, US"]
+    assert list(table["now °C"]) == [20.0, 30.0]
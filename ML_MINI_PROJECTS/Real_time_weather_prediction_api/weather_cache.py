@@ -0,0 +1,194 @@
+"""
+Layered cache in front of WeatherClient, shared by every user of the server process.
+
+  geocode  : persistent SQLite (survives restarts, shared by processes), keyed on the
+             normalized place name; coordinates never change, so entries live for days,
+             but "not found" answers (typos, transient bad responses) only for minutes
+  forecast : in-memory, keyed on lat/lon rounded to 2 decimals (~1 km); minutes-long TTL
+
+Both are size-bounded (least recently used out first) and stale-while-revalidate: an
+entry past its TTL but inside the stale window is returned at once while a background
+thread refreshes it. Concurrent misses for one key share a single upstream call.
+"""
+import collections
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+GEOCODE_DB = os.environ.get("WEATHER_GEOCODE_DB", "Data/geocode_cache.db")
+_NOT_FOUND = {"not_found": True}
+
+
+def normalize_place(name):
+    """'  new   York,US ' -> 'new york, us' (case, spacing and comma spacing ignored)."""
+    name = re.sub(r"\s*,\s*", ", ", name.strip().casefold())
+    return re.sub(r"\s+", " ", name)
+
+
+class SWRCache:
+    """
+    In-memory LRU with TTL + stale-while-revalidate; subclasses swap the storage.
+    Values for which is_negative(value) is true live negative_ttl seconds, with no
+    stale window.
+    """
+
+    def __init__(self, ttl, stale_ttl, max_entries, refresher=None, is_negative=None, negative_ttl=300):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.is_negative = is_negative
+        self.negative_ttl = negative_ttl
+        self.hits = self.stale_hits = self.misses = self.refreshes = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._refresher = refresher or ThreadPoolExecutor(max_workers=2, thread_name_prefix="swr")
+
+    # -------------------- Storage (overridden by PersistentSWRCache) --------------------
+    def _read(self, key):
+        item = self._data.get(key)
+        if item is not None:
+            self._data.move_to_end(key)
+        return item
+
+    def _write(self, key, value, fetched_at):
+        self._data[key] = (value, fetched_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    # -------------------- Lookup --------------------
+    def get(self, key, loader):
+        """Cached value for key, calling loader() on a miss (or in the background when stale)."""
+        with self._lock:
+            item = self._read(key)
+            age = time.time() - item[1] if item is not None else None
+            ttl, stale_ttl = self._lifetime(item[0]) if item is not None else (0, 0)
+            if age is not None and age <= ttl:
+                self.hits += 1
+                return item[0]
+            if age is not None and age <= ttl + stale_ttl:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    self._inflight[key] = self._refresher.submit(self._load, key, loader)
+                return item[0]
+            self.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if owner:
+            try:
+                future.set_result(self._load(key, loader, clear=False))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return future.result()
+
+    def _lifetime(self, value):
+        if self.is_negative is not None and self.is_negative(value):
+            return self.negative_ttl, 0
+        return self.ttl, self.stale_ttl
+
+    def _load(self, key, loader, clear=True):
+        try:
+            value = loader()
+            with self._lock:
+                self._write(key, value, time.time())
+            return value
+        finally:
+            if clear:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.stale_hits + self.misses
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                "refreshes": self.refreshes, "size": len(self),
+                "hit_rate": (self.hits + self.stale_hits) / total if total else 0.0}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PersistentSWRCache(SWRCache):
+    """
+    SWRCache whose entries live in a SQLite table (JSON values), bounded by row count.
+    Reads only note the access time in memory; the notes are written with the next
+    insert (or every TOUCH_BATCH reads), so a hit costs one SELECT and no commit.
+    """
+    TOUCH_BATCH = 256
+
+    def __init__(self, path, ttl, stale_ttl, max_entries, refresher=None, is_negative=None, negative_ttl=300):
+        super().__init__(ttl, stale_ttl, max_entries, refresher, is_negative, negative_ttl)
+        self._touched = {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                           "fetched_at REAL NOT NULL, used_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used_at)")
+        self._conn.commit()
+
+    def _read(self, key):
+        row = self._conn.execute("SELECT value, fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.TOUCH_BATCH:
+            self._flush_touches()
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def _flush_touches(self):
+        self._conn.executemany("UPDATE entries SET used_at = ? WHERE key = ?",
+                               [(used_at, key) for key, used_at in self._touched.items()])
+        self._touched.clear()
+
+    def _write(self, key, value, fetched_at):
+        self._flush_touches()
+        self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                           (key, json.dumps(value), fetched_at, time.time()))
+        excess = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute("DELETE FROM entries WHERE key IN "
+                               "(SELECT key FROM entries ORDER BY used_at LIMIT ?)", (excess,))
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class CachedWeatherClient:
+    """WeatherClient API (geocode / forecast) served through the two cache layers."""
+
+    def __init__(self, client, geocode_path=GEOCODE_DB, geocode_ttl=30 * 86400, not_found_ttl=300,
+                 forecast_ttl=600, forecast_stale=1800, max_places=50_000, max_forecasts=2_000):
+        self.client = client
+        refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-refresh")
+        self.geocodes = PersistentSWRCache(geocode_path, geocode_ttl, 7 * 86400, max_places, refresher,
+                                           is_negative=lambda value: value == _NOT_FOUND,
+                                           negative_ttl=not_found_ttl)
+        self.forecasts = SWRCache(forecast_ttl, forecast_stale, max_forecasts, refresher)
+
+    def geocode(self, city):
+        value = self.geocodes.get(normalize_place(city),
+                                  lambda: self.client.geocode(city) or _NOT_FOUND)
+        return None if value == _NOT_FOUND else value
+
+    def forecast(self, lat, lon):
+        key = (round(lat, 2), round(lon, 2))
+        return self.forecasts.get(key, lambda: self.client.forecast(*key))
+
+    def stats(self):
+        return {"geocode": self.geocodes.stats(), "forecast": self.forecasts.stats(),
+                "upstream": self.client.stats()}
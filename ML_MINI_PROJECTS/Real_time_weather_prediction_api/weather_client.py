@@ -0,0 +1,125 @@
+"""
+OpenWeatherMap client used by the weather page.
+
+One pooled requests.Session (keep-alive, so repeated calls reuse the TCP/TLS
+connection), https everywhere, connect/read timeouts, and retries with full-jitter
+exponential backoff on connection errors, timeouts, 429 and 5xx (Retry-After honoured).
+
+Point it at the local mock server for offline testing:
+    python mock_openweather.py --port 8081 --latency-ms 150 --fail-rate 0.2
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081 streamlit run weather_prediction_api.py
+"""
+import os
+import random
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = os.environ.get("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")
+API_KEY = os.environ.get("OPENWEATHER_API_KEY", "89abce4fc97ed48195e39db449e4b6b9")
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class WeatherAPIError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), None if unusable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:         # "-0000": HTTP-dates are GMT anyway
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+class WeatherClient:
+    def __init__(self, base_url=BASE_URL, api_key=API_KEY, timeout=(3.05, 10.0), retries=3,
+                 backoff=0.3, max_backoff=4.0, pool_size=16):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self.calls = self.retried = self.failed = 0
+
+    # -------------------- Transport --------------------
+    def _sleep_before_retry(self, attempt, retry_after=None):
+        if retry_after is not None:
+            delay = retry_after
+        else:       # full jitter: uniform in [0, backoff * 2^attempt]
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        time.sleep(min(delay, self.max_backoff))
+
+    def get_json(self, path, **params):
+        """GET base_url + path with the API key; retries transient failures."""
+        params["appid"] = self.api_key
+        url = f"{self.base_url}{path}"
+        with self._lock:
+            self.calls += 1
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    self._count_failure()
+                    raise WeatherAPIError(f"Weather service unreachable ({type(e).__name__}).") from e
+                self._count_retry()
+                self._sleep_before_retry(attempt)
+                continue
+
+            if response.status_code in RETRY_STATUS and not last:
+                self._count_retry()
+                self._sleep_before_retry(attempt, retry_after_seconds(response.headers.get("Retry-After")))
+                continue
+            if response.status_code != 200:
+                self._count_failure()
+                raise WeatherAPIError(f"Weather service returned HTTP {response.status_code}.", response.status_code)
+            return response.json()
+
+    def _count_retry(self):
+        with self._lock:
+            self.retried += 1
+
+    def _count_failure(self):
+        with self._lock:
+            self.failed += 1
+
+    # -------------------- API --------------------
+    def geocode(self, city):
+        """{"name", "lat", "lon", "country"} for the best match, or None if nothing matches."""
+        results = self.get_json("/geo/1.0/direct", q=city, limit=1)
+        if not results:
+            return None
+        top = results[0]
+        return {"name": top["name"], "lat": top["lat"], "lon": top["lon"], "country": top.get("country")}
+
+    def forecast(self, lat, lon, units="metric"):
+        """The 5 day / 3 hour forecast payload (forecast["list"] holds the time steps)."""
+        return self.get_json("/data/2.5/forecast", lat=lat, lon=lon, units=units)
+
+    def stats(self):
+        return {"calls": self.calls, "retries": self.retried, "failures": self.failed}
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,142 @@
+"""
+Multi-city forecast dashboard helpers (no Streamlit).
+
+fetch_many() geocodes + fetches every city on a bounded thread pool, so the total
+wait is about the slowest single city rather than the sum. forecast_frame() turns the
+whole 5 day / 3 hour forecast list into one columnar pandas frame, and
+plot_forecasts() draws per-city temperature / humidity / rain-chance series.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from weather_cache import normalize_place
+
+FAVOURITES_FILE = "Data/favourites.csv"
+MAX_PARALLEL = 8
+
+
+# ------------------ Favourites ------------------
+def load_favourites(user_name):
+    try:
+        with open(FAVOURITES_FILE) as f:
+            rows = [line.rstrip("\n").split(",", 1) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    return list(dict.fromkeys(city for user, city in rows if user == user_name))
+
+
+def save_favourites(user_name, cities):
+    """Replace user_name's favourites with cities (other users' rows are kept)."""
+    os.makedirs("Data", exist_ok=True)
+    try:
+        with open(FAVOURITES_FILE) as f:
+            others = [line for line in f if line.strip() and line.split(",", 1)[0] != user_name]
+    except FileNotFoundError:
+        others = []
+    with open(FAVOURITES_FILE, "w") as f:
+        f.writelines(others)
+        f.writelines(f"{user_name},{city}\n" for city in dict.fromkeys(cities))
+
+
+def parse_cities(text):
+    """
+    Cities from a newline / ';' separated string, duplicates (case and spacing
+    ignored) dropped. Commas stay inside a city ('Paris, FR'), as in the single-city
+    search.
+    """
+    seen, cities = set(), []
+    for part in text.replace("\n", ";").split(";"):
+        city = " ".join(part.split())
+        if city and normalize_place(city) not in seen:
+            seen.add(normalize_place(city))
+            cities.append(city)
+    return cities
+
+
+# ------------------ Fetching ------------------
+def _fetch_one(client, city):
+    t0 = time.perf_counter()
+    location = client.geocode(city)
+    if location is None:
+        raise LookupError("location not found")
+    return location, client.forecast(location["lat"], location["lon"]), time.perf_counter() - t0
+
+
+def fetch_many(client, cities, max_parallel=MAX_PARALLEL):
+    """
+    {city: (location, forecast, seconds)} for the cities that worked, {city: error} for
+    the rest, and the wall time of the whole fan-out.
+    """
+    results, errors = {}, {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(cities)))) as pool:
+        futures = {city: pool.submit(_fetch_one, client, city) for city in cities}
+        for city, future in futures.items():
+            try:
+                results[city] = future.result()
+            except Exception as e:
+                errors[city] = str(e)
+    return results, errors, time.perf_counter() - t0
+
+
+# ------------------ Frames ------------------
+def forecast_frame(city, forecast):
+    """All forecast steps of one city as columns (one row per 3-hour step)."""
+    steps = forecast["list"]
+    return pd.DataFrame({
+        "city": city,
+        "time": pd.to_datetime(np.fromiter((s["dt"] for s in steps), dtype=np.int64, count=len(steps)),
+                               unit="s", utc=True),
+        "temp": np.fromiter((s["main"]["temp"] for s in steps), dtype=np.float64, count=len(steps)),
+        "feels_like": np.fromiter((s["main"]["feels_like"] for s in steps), dtype=np.float64, count=len(steps)),
+        "humidity": np.fromiter((s["main"]["humidity"] for s in steps), dtype=np.float64, count=len(steps)),
+        "wind": np.fromiter((s["wind"]["speed"] for s in steps), dtype=np.float64, count=len(steps)),
+        "pop": np.fromiter((s.get("pop", 0.0) for s in steps), dtype=np.float64, count=len(steps)),
+        "condition": [s["weather"][0]["main"] for s in steps],
+    })
+
+
+def combined_frame(results):
+    """
+    One long frame for every fetched city (results as returned by fetch_many). Rows are
+    labelled with the city as entered, so two inputs that geocode to the same name
+    ('Paris, FR' and 'Paris, US') stay apart.
+    """
+    frames = [forecast_frame(city, forecast) for city, (location, forecast, _) in results.items()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def summary_table(frame):
+    """Now / min / max / mean per city, from the columnar frame."""
+    grouped = frame.groupby("city", sort=False)
+    return pd.DataFrame({
+        "now °C": grouped["temp"].first(),
+        "min °C": grouped["temp"].min(),
+        "max °C": grouped["temp"].max(),
+        "mean humidity %": grouped["humidity"].mean().round(0),
+        "max rain chance": (grouped["pop"].max() * 100).round(0).astype(int).astype(str) + "%",
+        "now": grouped["condition"].first(),
+    }).round(1)
+
+
+# ------------------ Plot ------------------
+def plot_forecasts(frame):
+    fig, axes = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+    for city, rows in frame.groupby("city", sort=False):
+        axes[0].plot(rows["time"], rows["temp"], label=city)
+        axes[1].plot(rows["time"], rows["humidity"], label=city)
+        axes[2].plot(rows["time"], rows["pop"] * 100, label=city)
+    axes[0].set_ylabel("Temperature (°C)")
+    axes[1].set_ylabel("Humidity (%)")
+    axes[2].set_ylabel("Rain chance (%)")
+    axes[0].legend(loc="upper left", fontsize="small", ncol=3)
+    for ax in axes:
+        ax.grid(alpha=0.3)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
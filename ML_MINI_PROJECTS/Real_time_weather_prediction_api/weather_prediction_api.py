@@ -1,12 +1,24 @@
 import streamlit as st
 import os
-import requests
 import matplotlib.pyplot as plt
 from datetime import datetime
+from weather_cache import CachedWeatherClient
+from weather_client import WeatherAPIError, WeatherClient
+from weather_dashboard import (combined_frame, fetch_many, load_favourites, parse_cities,
+                               plot_forecasts, save_favourites, summary_table)
 
 # ------------------ PAGE CONFIG ------------------
 st.set_page_config(page_title="Real Time Weather API", page_icon="🌤️")
 
+# ------------------ WEATHER CLIENT ------------------
+@st.cache_resource
+def get_weather_client():
+    """
+    One pooled keep-alive session per server process, behind the shared geocode
+    (persistent) and forecast (short TTL, stale-while-revalidate) caches.
+    """
+    return CachedWeatherClient(WeatherClient())
+
 # ------------------ SESSION STATE INIT ------------------
 if "user_name" not in st.session_state:
     st.session_state.user_name = None
@@ -80,6 +92,15 @@ with st.sidebar.expander("📝 Submit Feedback"):
                 f.write(f"{user_name},{feedback.strip()}\n")
             st.success("✅ Feedback submitted successfully.")
 
+# ------------------ CACHE METRICS ------------------
+with st.sidebar.expander("⚡ Cache Stats"):
+    cache_stats = get_weather_client().stats()
+    for level in ("geocode", "forecast"):
+        level_stats = cache_stats[level]
+        st.write(f"**{level.title()}**: {level_stats['hit_rate']:.0%} hit rate "
+                 f"({level_stats['hits']} fresh, {level_stats['stale_hits']} stale, {level_stats['misses']} misses)")
+    st.write(f"**API calls**: {cache_stats['upstream']['calls']} ({cache_stats['upstream']['retries']} retries)")
+
 # ------------------ PAGE TITLE ------------------
 st.title("🌍 Real Time Weather App")
 st.subheader("This App Uses the OpenWeatherMap API to Fetch Real-Time Weather Data.")
@@ -159,51 +180,76 @@ def display_history(user_name):
     except FileNotFoundError:
         st.sidebar.write("No history yet.")
 
+# ------------------ MULTI-CITY DASHBOARD ------------------
+mode = st.radio("View", ["Single City", "Multi-City Dashboard"], horizontal=True)
+
+if mode == "Multi-City Dashboard":
+    favourites = load_favourites(user_name)
+    cities_text = st.text_area("Cities (one per line or separated by ';', e.g. Paris, FR):",
+                               value="\n".join(favourites), placeholder="London\nParis, FR\nTokyo")
+    cities = parse_cities(cities_text)
+    col1, col2 = st.columns(2)
+    if col2.button("⭐ Save as Favourites"):
+        save_favourites(user_name, cities)
+        st.success(f"✅ Saved {len(cities)} favourite cities.")
+    if col1.button("Load Dashboard"):
+        if not cities:
+            st.warning("Enter at least one city.")
+        else:
+            # all cities are fetched concurrently: total time ~ the slowest city, not the sum
+            results, errors, elapsed = fetch_many(get_weather_client(), cities)
+            for failed_city, error in errors.items():
+                st.error(f"⚠️ {failed_city}: {error}")
+            if results:
+                slowest = max(seconds for _, _, seconds in results.values())
+                st.caption(f"Fetched {len(results)} cities in {elapsed:.2f}s (slowest single city {slowest:.2f}s)")
+                frame = combined_frame(results)
+                st.dataframe(summary_table(frame))
+                fig = plot_forecasts(frame)
+                st.pyplot(fig)
+                plt.close(fig)
+    st.stop()
+
 # ------------------ WEATHER FETCH ------------------
 city = st.text_input("Enter Country, City or Village Name:")
 
 if st.button("Get Weather"):
     if city:
-        api_key = "89abce4fc97ed48195e39db449e4b6b9"
-        geo_url = f"http://api.openweathermap.org/geo/1.0/direct?q={city}&limit=1&appid={api_key}"
-        geo_response = requests.get(geo_url).json()
-
-        if geo_response:
-            lat = geo_response[0]["lat"]
-            lon = geo_response[0]["lon"]
-            resolved_city = geo_response[0]["name"]
-
-            forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-            response = requests.get(forecast_url)
-
-            if response.status_code == 200:
-                forecast_data = response.json()
-                first_forecast = forecast_data["list"][0]
-
-                # Display Weather Details
-                temp = first_forecast["main"]["temp"]
-                feels = first_forecast["main"]["feels_like"]
-                humidity = first_forecast["main"]["humidity"]
-                wind = first_forecast["wind"]["speed"]
-                condition = first_forecast["weather"][0]["main"].lower()
-                description = first_forecast["weather"][0]["description"].title()
-                icon = first_forecast["weather"][0]["icon"]
-
-                emoji = emojis.get(condition, "🌈")
-                bg_url = backgrounds.get(condition, backgrounds["clear"])
-                set_background(bg_url)
-
-                st.header(f"{emoji} Forecasted Weather in {resolved_city} {emoji}")
-                st.image(f"http://openweathermap.org/img/wn/{icon}@2x.png")
-                st.markdown(f"**Condition**: {description}")
-                st.markdown(f"**Temperature**: {temp}°C")
-                st.markdown(f"**Feels Like**: {feels}°C → {describe_feel(feels)}")
-                st.markdown(f"**Humidity**: {humidity}%")
-                st.markdown(f"**Wind Speed**: {wind} m/s")
-
-                log_search(user_name, city.title())
-                display_history(user_name)
-            else:
-                st.error("❌ Could not fetch forecast data. Try again.")
+        client = get_weather_client()
+        try:
+            location = client.geocode(city)
+            forecast_data = client.forecast(location["lat"], location["lon"]) if location else None
+        except WeatherAPIError as e:
+            location = forecast_data = None
+            st.error(f"❌ Could not fetch forecast data. Try again. ({e})")
         else:
-            st.error("⚠️ Location not found. Try another spelling or nearby place.")
+            if not location:
+                st.error("⚠️ Location not found. Try another spelling or nearby place.")
+
+        if forecast_data:
+            resolved_city = location["name"]
+            first_forecast = forecast_data["list"][0]
+
+            # Display Weather Details
+            temp = first_forecast["main"]["temp"]
+            feels = first_forecast["main"]["feels_like"]
+            humidity = first_forecast["main"]["humidity"]
+            wind = first_forecast["wind"]["speed"]
+            condition = first_forecast["weather"][0]["main"].lower()
+            description = first_forecast["weather"][0]["description"].title()
+            icon = first_forecast["weather"][0]["icon"]
+
+            emoji = emojis.get(condition, "🌈")
+            bg_url = backgrounds.get(condition, backgrounds["clear"])
+            set_background(bg_url)
+
+            st.header(f"{emoji} Forecasted Weather in {resolved_city} {emoji}")
+            st.image(f"https://openweathermap.org/img/wn/{icon}@2x.png")
+            st.markdown(f"**Condition**: {description}")
+            st.markdown(f"**Temperature**: {temp}°C")
+            st.markdown(f"**Feels Like**: {feels}°C → {describe_feel(feels)}")
+            st.markdown(f"**Humidity**: {humidity}%")
+            st.markdown(f"**Wind Speed**: {wind} m/s")
+
+            log_search(user_name, city.title())
+            display_history(user_name)
@@ -0,0 +1,194 @@
+"""
+Offline sentiment scoring for large review files.
+
+The input is streamed chunk by chunk (CSV, JSONL or Parquet). Each chunk goes through
+normalize_many (URL / mention / hashtag stripping + emoji handling), optional batched
+translation (--translate) and batched inference on one of N worker processes, each with its own model and a pinned number
+of torch threads. Results are appended to the
+output in input order as soon as the oldest in-flight chunk finishes, so memory
+stays flat no matter how big the input is.
+
+After every written chunk the number of finished rows is recorded in <output>.progress.
+--resume skips those rows and appends from there after an interruption.
+
+Usage:
+    python bulk_score.py reviews.csv scores.csv --column review --workers 4 --threads 2
+    python bulk_score.py reviews.parquet scores.jsonl --column text --resume
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sentiment_model import LABELS, predict_batch
+from sentiment_cache import predict_cached
+from text_normalization import normalize_many
+
+PROGRESS_SUFFIX = ".progress"
+
+_tokenizer = _model = _translator = _cache = None
+
+
+# -------------------- Reading --------------------
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".tsv"):
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Unsupported file type {ext!r} (use .csv, .jsonl or .parquet).")
+
+
+def read_chunks(path, column, chunk_size, skip=0):
+    """Yield (offset, [texts]) chunks of the text column, starting at row `skip`."""
+    fmt = _format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        frames = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=[column]))
+    elif fmt == "jsonl":
+        frames = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        frames = pd.read_csv(path, usecols=[column], chunksize=chunk_size,
+                             sep="\t" if path.lower().endswith(".tsv") else ",")
+
+    offset = 0
+    for frame in frames:
+        texts = frame[column].fillna("").astype(str).tolist()
+        end = offset + len(texts)
+        if end > skip:
+            start = max(skip - offset, 0)
+            yield offset + start, texts[start:]
+        offset = end
+
+
+# -------------------- Workers --------------------
+def _init_worker(threads, backend, translator, cache):
+    global _tokenizer, _model, _translator, _cache
+    import torch
+    from sentiment_model import load_roberta_model, model_version
+    torch.set_num_threads(threads)
+    _tokenizer, _model = load_roberta_model(backend)
+    if cache:
+        from sentiment_cache import SentimentCache
+        _cache = SentimentCache(model_version(backend), path=cache)
+    if translator:
+        from translation import Translator
+        _translator = Translator(translator)
+
+
+def score_chunk(offset, texts, batch_size):
+    """(offset, probabilities (len(texts), 3)) for one chunk, length-bucketed, batch_size windows per pass."""
+    cleaned = normalize_many(texts)
+    if _translator is not None:
+        cleaned = _translator.translate_many(cleaned)
+    # duplicates within the chunk (and, with --cache, texts seen in earlier runs) are scored once
+    return offset, predict_cached(cleaned, _cache,
+                                  lambda texts: predict_batch(texts, _tokenizer, _model, max_batch=batch_size))
+
+
+# -------------------- Writing --------------------
+def write_chunk(out, fmt, offset, probs, header):
+    frame = pd.DataFrame(probs, columns=[label.lower() for label in LABELS])
+    frame.insert(0, "row", np.arange(offset, offset + len(probs)))
+    frame.insert(1, "label", np.asarray(LABELS)[probs.argmax(axis=1)] if len(probs) else [])
+    if fmt == "jsonl":
+        if len(frame):
+            out.write(frame.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+    else:
+        frame.to_csv(out, index=False, header=header, float_format="%.5f")
+    out.flush()
+    os.fsync(out.fileno())
+
+
+def read_progress(output):
+    try:
+        with open(output + PROGRESS_SUFFIX) as f:
+            return int(json.load(f)["rows"])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def write_progress(output, rows):
+    tmp = output + PROGRESS_SUFFIX + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"rows": rows}, f)
+    os.replace(tmp, output + PROGRESS_SUFFIX)
+
+
+# -------------------- Driver --------------------
+def run(args):
+    fmt = _format(args.output)
+    if fmt == "parquet":
+        raise ValueError("Write results as .csv or .jsonl (appendable); convert afterwards if needed.")
+    done = read_progress(args.output) if args.resume else 0
+    if not args.resume and os.path.exists(args.output):
+        raise ValueError(f"{args.output} exists; pass --resume to continue it or remove it.")
+    if args.resume and os.path.exists(args.output):
+        _truncate_to_rows(args.output, fmt, done)
+
+    chunks = read_chunks(args.input, args.column, args.chunk_size, skip=done)
+    pending = deque()
+    max_in_flight = args.workers * 2
+    rows, t0 = done, time.perf_counter()
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.threads, args.backend, args.translate, args.cache)) as pool, \
+            open(args.output, "a", encoding="utf-8", newline="") as out:
+        header = out.tell() == 0
+
+        def drain_one():
+            nonlocal rows, header
+            offset, probs = pending.popleft().result()
+            write_chunk(out, fmt, offset, probs, header)
+            header = False
+            rows = offset + len(probs)
+            write_progress(args.output, rows)
+            elapsed = time.perf_counter() - t0
+            print(f"\r{rows:,} rows  ({(rows - done) / elapsed:,.0f} rows/s)", end="", flush=True)
+
+        for offset, texts in chunks:
+            pending.append(pool.submit(score_chunk, offset, texts, args.batch_size))
+            if len(pending) >= max_in_flight:       # backpressure: never read far ahead
+                drain_one()
+        while pending:
+            drain_one()
+    print(f"\nDone: {rows:,} rows in {args.output}")
+
+
+def _truncate_to_rows(output, fmt, rows):
+    """Drop rows written after the last recorded progress (an interrupted chunk)."""
+    keep = rows + (1 if fmt == "csv" else 0)       # csv header line
+    with open(output, "rb+") as f:
+        for _ in range(keep):
+            if not f.readline():
+                return
+        f.truncate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a large CSV / JSONL / Parquet file of reviews.")
+    parser.add_argument("input")
+    parser.add_argument("output", help=".csv or .jsonl")
+    parser.add_argument("--column", default="text", help="name of the text column")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--threads", type=int, default=2, help="torch threads per worker")
+    parser.add_argument("--chunk-size", type=int, default=2048, help="rows per worker task")
+    parser.add_argument("--batch-size", type=int, default=32, help="texts per forward pass")
+    parser.add_argument("--backend", default=None, help="torch / int8 / onnx (default: $SENTIMENT_BACKEND)")
+    parser.add_argument("--translate", nargs="?", const="google", choices=("google", "none"),
+                        help="translate non-English rows first (batched, cached in translation_cache.db)")
+    parser.add_argument("--cache", nargs="?", const="sentiment_cache.db",
+                        help="reuse / store scores in this SQLite cache (default file: sentiment_cache.db)")
+    parser.add_argument("--resume", action="store_true", help="continue after the rows in <output>.progress")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
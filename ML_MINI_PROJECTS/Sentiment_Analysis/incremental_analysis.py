@@ -0,0 +1,39 @@
+"""
+Incremental re-analysis for edited text.
+
+Every sentence goes through the SentimentService, whose score cache (SentimentCache)
+answers the ones seen before at once, so after an edit only new or changed sentences
+reach the model. The document result is then rebuilt from the sentence scores
+(combine_sentence_scores, an approximation of the model's document score) unless an
+exact document pass is asked for; an unchanged document is served from the same cache
+either way.
+"""
+import logging
+
+from sentiment_model import combine_sentence_scores, scores_to_result
+
+log = logging.getLogger(__name__)
+
+
+def analyze_incremental(service, text, sentences, exact_document=False, timeout=None):
+    """
+    (sentiment, scores, [(sentence, probabilities), ...], n_new) where n_new is the
+    number of distinct sentences that were not in the service's cache and went to the
+    model.
+    """
+    doc = service.submit(text) if exact_document else None
+    unique = list(dict.fromkeys(sentences))
+    cached = {}
+    if service.cache is not None:
+        try:
+            cached = service.cache.get_many(unique)
+        except Exception:       # e.g. sqlite3.OperationalError: score everything instead
+            log.exception("Sentiment cache lookup failed")
+    scores = {s: cached[i] for i, s in enumerate(unique) if i in cached}
+    futures = {s: service.submit(s, clean=False, lookup=False) for s in unique if s not in scores}
+    for s, future in futures.items():
+        scores[s] = future.result(timeout)
+    sentence_scores = [(s, scores[s]) for s in sentences]
+    probs = doc.result(timeout) if doc is not None else combine_sentence_scores(sentence_scores)
+    sentiment, doc_scores = scores_to_result(probs)
+    return sentiment, doc_scores, sentence_scores, len(futures)
@@ -0,0 +1,80 @@
+"""
+Load test for sentiment_server.py: throughput and latency against concurrency.
+
+    python loadgen.py --url http://127.0.0.1:8000 --concurrency 1,8,32,128 --requests 1000
+    python loadgen.py --batch 16 --sentences
+
+For every concurrency level, that many clients send requests back to back until
+--requests have been made; the report has requests/s, texts/s, latency percentiles
+and how many requests were shed with 503.
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+import numpy as np
+
+SAMPLES = [
+    "I love this product!", "Worst purchase ever, it broke after a day.", "It is okay, nothing special.",
+    "Delivery was fast but the box was damaged. Support never answered my emails.",
+    "Absolutely fantastic customer service.", "Not sure how I feel about the new update.",
+]
+
+
+async def run_level(url, concurrency, total, batch, sentences, unique):
+    latencies, statuses = [], {}
+    counter = iter(range(total))
+
+    def payload(i):
+        # unique=True appends the request number so the server's score cache cannot help
+        texts = [SAMPLES[(i + j) % len(SAMPLES)] + (f" #{i}-{j}" if unique else "") for j in range(batch)]
+        body = {"text": texts[0]} if batch == 1 else {"texts": texts}
+        if sentences:
+            body["sentences"] = True
+        return body
+
+    async def client(session):
+        for i in counter:
+            t0 = time.perf_counter()
+            async with session.post(url, json=payload(i)) as resp:
+                await resp.read()
+                statuses[resp.status] = statuses.get(resp.status, 0) + 1
+                if resp.status == 200:
+                    latencies.append(time.perf_counter() - t0)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    ok = statuses.get(200, 0)
+    return {"concurrency": concurrency, "req_s": ok / elapsed, "texts_s": ok * batch / elapsed,
+            "p50": np.percentile(ms, 50), "p95": np.percentile(ms, 95), "p99": np.percentile(ms, 99),
+            "shed": statuses.get(503, 0), "errors": total - ok - statuses.get(503, 0)}
+
+
+async def main_async(args):
+    url = args.url.rstrip("/") + "/v1/sentiment"
+    print(f"{'conc':>5}{'req/s':>9}{'texts/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'503':>6}{'err':>5}")
+    for c in (int(x) for x in args.concurrency.split(",")):
+        r = await run_level(url, c, args.requests, args.batch, args.sentences, not args.repeat)
+        print(f"{r['concurrency']:>5}{r['req_s']:>9.1f}{r['texts_s']:>10.1f}{r['p50']:>9.1f}{r['p95']:>9.1f}"
+              f"{r['p99']:>9.1f}{r['shed']:>6}{r['errors']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput vs concurrency for sentiment_server.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--batch", type=int, default=1, help="texts per request")
+    parser.add_argument("--sentences", action="store_true", help="ask for per-sentence attribution")
+    parser.add_argument("--repeat", action="store_true", help="send repeated texts (exercises the score cache)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
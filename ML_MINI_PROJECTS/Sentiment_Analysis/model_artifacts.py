@@ -0,0 +1,171 @@
+"""
+Local, offline copy of everything the sentiment app downloads at runtime.
+
+    python model_artifacts.py --prepare     # once, on a machine with network access
+    python model_artifacts.py --verify      # check the copy (e.g. after moving it)
+
+Layout under MODEL_PATH:
+    tokenizer/       AutoTokenizer.save_pretrained
+    model/           AutoModelForSequenceClassification.save_pretrained (safetensors)
+    nltk_data/       punkt + punkt_tab
+    manifest.json    model name + sha256 / size of every file above
+    verified.json    size + mtime of every file when it last passed the full sha256 check
+
+When manifest.json exists the app loads only from disk (no hub resolver, weights
+memory-mapped from safetensors) and refuses to start if a checksum does not match.
+Loads only compare size + mtime with verified.json; the ~500 MB of weights are
+hashed again only when a file changed (or was copied), and by --verify / --prepare.
+"""
+import hashlib
+import json
+import os
+
+MANIFEST = "manifest.json"
+VERIFIED = "verified.json"
+NLTK_PACKAGES = ("punkt", "punkt_tab")
+_CHUNK = 1 << 20
+
+
+# -------------------- Checksums --------------------
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _artifact_files(root):
+    for sub in ("tokenizer", "model", "nltk_data"):
+        for dirpath, _, files in os.walk(os.path.join(root, sub)):
+            for name in sorted(files):
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, root).replace(os.sep, "/"), path
+
+
+def has_artifacts(root):
+    return os.path.exists(os.path.join(root, MANIFEST))
+
+
+def manifest_digest(root):
+    """Short hash of the manifest: changes whenever any saved artefact changes."""
+    with open(os.path.join(root, MANIFEST), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+# -------------------- Prepare / Verify --------------------
+def prepare(root, model_name):
+    """Download tokenizer, weights and NLTK data into root and write the manifest."""
+    import nltk
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(os.path.join(root, "tokenizer"))
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.save_pretrained(os.path.join(root, "model"), safe_serialization=True)
+    for package in NLTK_PACKAGES:
+        nltk.download(package, download_dir=os.path.join(root, "nltk_data"), quiet=True)
+
+    files = {rel: {"sha256": _sha256(path), "size": os.path.getsize(path)}
+             for rel, path in _artifact_files(root)}
+    with open(os.path.join(root, MANIFEST), "w") as f:
+        json.dump({"model_name": model_name, "files": files}, f, indent=2)
+    _write_verified(root, files)
+    return files
+
+
+def verify(root):
+    """Full sha256 check: raise ValueError listing every missing or modified artefact file."""
+    with open(os.path.join(root, MANIFEST)) as f:
+        manifest = json.load(f)
+    problems = []
+    for rel, expected in manifest["files"].items():
+        path = os.path.join(root, rel)
+        if not os.path.exists(path):
+            problems.append(f"missing {rel}")
+        elif os.path.getsize(path) != expected["size"] or _sha256(path) != expected["sha256"]:
+            problems.append(f"checksum mismatch {rel}")
+    if problems:
+        raise ValueError(f"Model artefacts in {root} are corrupt ({', '.join(problems)}); "
+                         f"re-run python model_artifacts.py --prepare.")
+    _write_verified(root, manifest["files"])
+    return manifest
+
+
+def _stat(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _write_verified(root, files):
+    stamp = {"manifest": manifest_digest(root),
+             "files": {rel: _stat(os.path.join(root, rel)) for rel in files}}
+    tmp = os.path.join(root, f"{VERIFIED}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(stamp, f)
+    os.replace(tmp, os.path.join(root, VERIFIED))
+
+
+def quick_verify(root):
+    """
+    verify() only when something changed since the last full check: every file's
+    size + mtime (and the manifest) are compared with verified.json first.
+    """
+    try:
+        with open(os.path.join(root, VERIFIED)) as f:
+            stamp = json.load(f)
+        with open(os.path.join(root, MANIFEST)) as f:
+            expected = json.load(f)["files"]
+        if (stamp["manifest"] == manifest_digest(root) and stamp["files"].keys() == expected.keys()
+                and all(_stat(os.path.join(root, rel)) == st for rel, st in stamp["files"].items())):
+            return
+    except (OSError, ValueError, KeyError):
+        pass
+    verify(root)
+
+
+# -------------------- Load --------------------
+def load_local(root, check=True):
+    """(tokenizer, model) from the local copy, without touching the network (local_files_only)."""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    if check:
+        quick_verify(root)
+    tokenizer = AutoTokenizer.from_pretrained(os.path.join(root, "tokenizer"), local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        os.path.join(root, "model"), local_files_only=True, use_safetensors=True)
+    return tokenizer, model
+
+
+def ensure_nltk_data(root):
+    """Point NLTK at the local copy; fall back to downloading when there is none."""
+    import nltk
+    local = os.path.join(root, "nltk_data")
+    if os.path.isdir(local):
+        if local not in nltk.data.path:
+            nltk.data.path.insert(0, local)
+        return
+    for package in NLTK_PACKAGES:
+        nltk.download(package, quiet=True)
+
+
+def main():
+    import argparse
+    from sentiment_model import MODEL_NAME, MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Manage the offline sentiment model artefacts.")
+    parser.add_argument("--prepare", action="store_true", help="download and save everything locally")
+    parser.add_argument("--verify", action="store_true", help="check every file against the manifest")
+    parser.add_argument("--path", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.prepare:
+        files = prepare(args.path, MODEL_NAME)
+        size = sum(f["size"] for f in files.values()) / 1e6
+        print(f"Saved {len(files)} files ({size:.1f} MB) to {args.path}")
+    if args.verify or not args.prepare:
+        manifest = verify(args.path)
+        print(f"{len(manifest['files'])} files OK ({manifest['model_name']})")
+
+
+if __name__ == "__main__":
+    main()
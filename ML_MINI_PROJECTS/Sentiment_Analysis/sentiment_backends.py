@@ -0,0 +1,215 @@
+"""
+Alternative CPU inference backends for the RoBERTa sentiment model.
+
+  torch : the fp32 transformers model (baseline)
+  int8  : PyTorch dynamic int8 quantization of the Linear layers
+  onnx  : the model exported to ONNX and run with onnxruntime
+
+The int8 model is quantized in memory at load (a few seconds; nothing is unpickled
+from disk). The ONNX export is cached as MODEL_PATH/onnx/<source digest>/model.onnx,
+keyed on the weights it was made from, so re-running model_artifacts.py --prepare
+(or switching models) triggers a fresh export instead of serving the old one.
+
+Accuracy / latency / memory comparison against the fp32 baseline:
+    python sentiment_backends.py --compare
+    python sentiment_backends.py --compare --texts reviews.txt --batch 16
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "torch")
+NUM_THREADS = int(os.environ.get("SENTIMENT_TORCH_THREADS", "0"))
+
+
+# -------------------- int8 --------------------
+def quantize_int8(model):
+    """Dynamically quantized copy of model's Linear layers, built from the fp32 weights just loaded."""
+    return torch.quantization.quantize_dynamic(model.cpu(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+# -------------------- ONNX --------------------
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def onnx_path(model_path, source):
+    """Where the export of the weights identified by source (see sentiment_model.model_source) lives."""
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(model_path, "onnx", key, "model.onnx")
+
+
+def export_onnx(model, tokenizer, model_path, source):
+    """
+    Export to onnx_path(model_path, source) unless that file exists, and return its path.
+    Exports made from other weights are deleted.
+    """
+    path = onnx_path(model_path, source)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        partial = f"{path}.{os.getpid()}.partial"       # never leave a half-written model.onnx behind
+        torch.onnx.export(
+            _LogitsOnly(model.cpu().eval()), (sample["input_ids"], sample["attention_mask"]), partial,
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "attention_mask": {0: "batch", 1: "seq"},
+                          "logits": {0: "batch"}},
+            opset_version=14,
+        )
+        os.replace(partial, path)
+    onnx_root, current = os.path.dirname(os.path.dirname(path)), os.path.basename(os.path.dirname(path))
+    for old in os.listdir(onnx_root):
+        stale = os.path.join(onnx_root, old)
+        if old == current:
+            continue
+        if os.path.isdir(stale):
+            shutil.rmtree(stale, ignore_errors=True)
+        elif not old.endswith(".partial"):
+            os.remove(stale)        # pre-digest export (onnx/model.onnx)
+    return path
+
+
+class OnnxSentimentModel:
+    """Callable like the transformers model: model(**encoded).logits"""
+
+    device = torch.device("cpu")
+
+    def __init__(self, onnx_path, num_threads=NUM_THREADS):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+    def __call__(self, input_ids, attention_mask, **_):
+        logits = self.session.run(["logits"], {"input_ids": input_ids.cpu().numpy().astype(np.int64),
+                                               "attention_mask": attention_mask.cpu().numpy().astype(np.int64)})[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def convert(tokenizer, model, backend, model_path, source):
+    """
+    Turn the fp32 transformers model into the requested backend's model.
+    source identifies the fp32 weights (manifest digest or hub name); cached exports are keyed on it.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose one of {BACKENDS}.")
+    if backend == "int8":
+        return quantize_int8(model)
+    if backend == "onnx":
+        return OnnxSentimentModel(export_onnx(model, tokenizer, model_path, source))
+    return model
+
+
+# -------------------- Comparison report --------------------
+SAMPLE_TEXTS = [
+    "I love this product!", "Worst purchase ever, it broke after a day.", "It is okay, nothing special.",
+    "Delivery was fast but the box was damaged.", "Absolutely fantastic customer service.",
+    "Not sure how I feel about the new update.", "Terrible. Would not recommend to anyone.",
+    "The battery lasts all day and the screen is gorgeous.", "Meh.", "Great value for the price!",
+]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(backend, texts, batch, out_path):
+    """Run in a fresh process: load one backend, score texts, record latency and RSS."""
+    from sentiment_model import load_roberta_model, predict_batch
+    if NUM_THREADS:
+        torch.set_num_threads(NUM_THREADS)
+    t0 = time.perf_counter()
+    tokenizer, model = load_roberta_model(backend)
+    load_s = time.perf_counter() - t0
+    predict_batch(texts[:batch], tokenizer, model)    # warm-up
+    latencies, probs = [], []
+    for i in range(0, len(texts), batch):
+        t0 = time.perf_counter()
+        probs.append(predict_batch(texts[i:i + batch], tokenizer, model))
+        latencies.append(time.perf_counter() - t0)
+    np.save(out_path + ".npy", np.concatenate(probs))
+    ms = np.asarray(latencies) * 1000
+    with open(out_path + ".json", "w") as f:
+        json.dump({"backend": backend, "load_s": load_s, "batch_p50_ms": float(np.percentile(ms, 50)),
+                   "batch_p95_ms": float(np.percentile(ms, 95)),
+                   "texts_per_s": len(texts) / (ms.sum() / 1000), "peak_rss_mb": _peak_rss_mb()}, f)
+
+
+def compare(texts, batch):
+    with tempfile.TemporaryDirectory() as tmp:
+        text_file = os.path.join(tmp, "texts.json")
+        with open(text_file, "w") as f:
+            json.dump(texts, f)
+        reports, probs = {}, {}
+        for backend in BACKENDS:
+            out = os.path.join(tmp, backend)
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", backend,
+                            "--texts-json", text_file, "--batch", str(batch), "--out", out],
+                           check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            with open(out + ".json") as f:
+                reports[backend] = json.load(f)
+            probs[backend] = np.load(out + ".npy")
+
+    base = probs["torch"]
+    print(f"{len(texts)} texts, batch {batch}\n")
+    print(f"{'backend':<8}{'agree':>8}{'max|dp|':>10}{'p50 ms':>10}{'p95 ms':>10}{'texts/s':>10}{'RSS MB':>10}{'load s':>9}")
+    for backend, r in reports.items():
+        agree = float((probs[backend].argmax(1) == base.argmax(1)).mean()) * 100
+        max_diff = float(np.abs(probs[backend] - base).max())
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] else "n/a"
+        print(f"{backend:<8}{agree:>7.1f}%{max_diff:>10.4f}{r['batch_p50_ms']:>10.1f}{r['batch_p95_ms']:>10.1f}"
+              f"{r['texts_per_s']:>10.1f}{rss:>10}{r['load_s']:>9.1f}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare sentiment inference backends against fp32.")
+    parser.add_argument("--compare", action="store_true", help="run every backend and print the report")
+    parser.add_argument("--texts", help="text file, one review per line (default: built-in samples)")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--measure", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--texts-json", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        with open(args.texts_json) as f:
+            measure(args.measure, json.load(f), args.batch, args.out)
+        return
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_TEXTS * 10
+    compare(texts, args.batch)
+
+
+if __name__ == "__main__":
+    main()
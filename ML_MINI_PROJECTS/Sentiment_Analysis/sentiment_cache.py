@@ -0,0 +1,171 @@
+"""
+Two-level cache of sentiment probabilities.
+
+  memory : in-process LRU (text key -> probabilities)
+  disk   : SQLite table shared by every process on the machine, survives restarts
+
+Keys are a hash of the exact text the model sees (cleaned, translated document or
+sentence) together with the model version, so document and sentence scores share one
+cache. Processes running different versions (new weights, another backend, other
+window settings) can share the database: each only ever reads rows written under its
+own version, and rows of versions no longer in use age out when the disk level is
+trimmed to max_disk rows, least recently used first (when it is opened and every
+TRIM_EVERY inserts). Hits only note the access time in memory; the notes are written
+with the next insert (or every TOUCH_BATCH hits), so lookups do not commit one by one.
+"""
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+SENTIMENT_CACHE = os.environ.get("SENTIMENT_CACHE_DB", "sentiment_cache.db")
+N_CLASSES = 3       # Negative / Neutral / Positive
+
+
+class SentimentCache:
+    TOUCH_BATCH = 1024
+    TRIM_EVERY = 10_000
+
+    def __init__(self, model_version, path=SENTIMENT_CACHE, max_memory=50_000, max_disk=5_000_000):
+        self.model_version = model_version
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._touched = {}              # key -> last use, not yet written
+        self._inserted = 0              # since the last trim
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, probs BLOB NOT NULL, "
+                               "used_at REAL NOT NULL DEFAULT 0)")
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(scores)")]
+            if "used_at" not in columns:        # databases from before last-use tracking
+                self._conn.execute("ALTER TABLE scores ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scores_used ON scores (used_at)")
+            self._conn.commit()
+            self.trim()
+
+    def key(self, text):
+        return hashlib.blake2b(f"{self.model_version}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    # -------------------- Lookup / store --------------------
+    def get_many(self, texts):
+        """{position: probabilities} for every text found in either level."""
+        found, disk_keys = {}, {}
+        now = time.time()
+        with self._lock:
+            for i, text in enumerate(texts):
+                k = self.key(text)
+                probs = self._memory.get(k)
+                if probs is not None:
+                    self._memory.move_to_end(k)
+                    self.memory_hits += 1
+                    self._touched[k] = now
+                    found[i] = probs
+                else:
+                    disk_keys.setdefault(k, []).append(i)
+            if disk_keys and self._conn is not None:
+                keys = list(disk_keys)
+                for start in range(0, len(keys), 500):
+                    part = keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, probs FROM scores WHERE key IN ({','.join('?' * len(part))})", part)
+                    for k, blob in rows:
+                        probs = np.frombuffer(blob, dtype=np.float32)
+                        self._remember(k, probs)
+                        self._touched[k] = now
+                        for i in disk_keys.pop(k):
+                            found[i] = probs
+                            self.disk_hits += 1
+            self.misses += sum(len(v) for v in disk_keys.values())
+            if self._conn is not None and len(self._touched) >= self.TOUCH_BATCH:
+                self._flush_touches()
+                self._conn.commit()
+        return found
+
+    def put_many(self, texts, probs):
+        rows = [(self.key(t), np.asarray(p, dtype=np.float32)) for t, p in zip(texts, probs)]
+        with self._lock:
+            for k, p in rows:
+                self._remember(k, p)
+            if self._conn is not None:
+                self._flush_touches()
+                now = time.time()
+                self._conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?)",
+                                       [(k, p.tobytes(), now) for k, p in rows])
+                self._conn.commit()
+                self._inserted += len(rows)
+        if self._inserted >= self.TRIM_EVERY:
+            self.trim()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany("UPDATE scores SET used_at = ? WHERE key = ?",
+                                   [(used_at, k) for k, used_at in self._touched.items()])
+        self._touched.clear()
+
+    def _remember(self, k, probs):
+        self._memory[k] = probs
+        self._memory.move_to_end(k)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def trim(self):
+        """Keep the disk level under max_disk rows (least recently used first out)."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._inserted = 0
+            self._flush_touches()
+            excess = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_disk
+            if excess > 0:
+                self._conn.execute("DELETE FROM scores WHERE rowid IN "
+                                   "(SELECT rowid FROM scores ORDER BY used_at LIMIT ?)", (excess,))
+            self._conn.commit()
+
+    # -------------------- Metrics --------------------
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / total if total else 0.0,
+                "memory_size": len(self._memory), "model_version": self.model_version}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches()
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+def predict_cached(texts, cache, predict):
+    """
+    predict(list_of_texts) -> probabilities, run only for distinct texts missing from
+    the cache; results are stored back. cache=None just dedupes.
+    """
+    texts = list(texts)
+    out = np.empty((len(texts), N_CLASSES), dtype=np.float32)
+    found = cache.get_many(texts) if cache is not None else {}
+    for i, probs in found.items():
+        out[i] = probs
+    missing = {}
+    for i, text in enumerate(texts):
+        if i not in found:
+            missing.setdefault(text, []).append(i)
+    if missing:
+        unique = list(missing)
+        probs = predict(unique)
+        for text, row in zip(unique, probs):
+            out[missing[text]] = row
+        if cache is not None:
+            cache.put_many(unique, probs)
+    return out
@@ -0,0 +1,195 @@
+# -------------------- Import Required Libraries --------------------
+import time
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from sentiment_backends import DEFAULT_BACKEND, convert
+from model_artifacts import has_artifacts, load_local, manifest_digest
+from text_normalization import clean_text, emoji_to_text, is_only_emoji  # re-exported for callers
+
+# -------------------- Setup Model Directory --------------------
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+MODEL_PATH = "./saved_roberta_model"
+LABELS = ["Negative", "Neutral", "Positive"]
+MAX_LENGTH = 512
+
+# -------------------- Setup Device --------------------
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# -------------------- Load Model --------------------
+def load_roberta_model(backend=None):
+    """
+    (tokenizer, model) for the given backend - "torch" (fp32), "int8" or "onnx"
+    (default: $SENTIMENT_BACKEND or "torch"). int8 / onnx always run on the CPU.
+    Loads the checksummed offline copy in MODEL_PATH when there is one
+    (python model_artifacts.py --prepare), otherwise resolves MODEL_NAME on the hub.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if has_artifacts(MODEL_PATH):
+        tokenizer, model = load_local(MODEL_PATH)
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+    if backend == "torch":
+        return tokenizer, model.to(device)
+    return tokenizer, convert(tokenizer, model, backend, MODEL_PATH, model_source()).eval()
+
+def model_source():
+    """Identifies the fp32 weights: manifest digest of the local copy, else the hub model name."""
+    return manifest_digest(MODEL_PATH) if has_artifacts(MODEL_PATH) else MODEL_NAME
+
+def model_version(backend=None):
+    """Identifies everything that changes the scores; cached scores are tied to it."""
+    return f"{model_source()}|{backend or DEFAULT_BACKEND}|{MAX_LENGTH}|{WINDOW_OVERLAP}"
+
+# -------------------- Inference --------------------
+# Texts are tokenized once, sorted by token count and batched per length bucket, so a
+# batch is only padded to its own longest member. Texts longer than MAX_LENGTH are split
+# into overlapping windows whose logits are averaged (weighted by window length) instead
+# of being truncated.
+BUCKETS = (32, 64, 128, 256, MAX_LENGTH)
+WINDOW_OVERLAP = 64
+
+class BucketStats:
+    """Per-bucket padding waste and latency, accumulated over predict_batch calls."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.long_texts = 0
+
+    def record(self, bucket, windows, tokens, padded, seconds):
+        b = self.buckets.setdefault(bucket, {"windows": 0, "batches": 0, "tokens": 0, "padded": 0, "seconds": 0.0})
+        b["windows"] += windows
+        b["batches"] += 1
+        b["tokens"] += tokens
+        b["padded"] += padded
+        b["seconds"] += seconds
+
+    def report(self):
+        out = {}
+        for bucket, b in sorted(self.buckets.items()):
+            out[f"<={bucket}"] = {"windows": b["windows"], "batches": b["batches"],
+                                  "padding_waste": 1 - b["tokens"] / b["padded"] if b["padded"] else 0.0,
+                                  "ms_per_batch": b["seconds"] * 1000 / b["batches"]}
+        tokens = sum(b["tokens"] for b in self.buckets.values())
+        padded = sum(b["padded"] for b in self.buckets.values())
+        return {"buckets": out, "padding_waste": 1 - tokens / padded if padded else 0.0,
+                "long_texts": self.long_texts}
+
+def _windows(ids, size, step):
+    """Overlapping slices of ids, each at most size long, together covering all of ids."""
+    out = [ids[:size]]
+    start = 0
+    while start + size < len(ids):
+        start += step
+        out.append(ids[start:start + size])
+    return out
+
+def predict_batch(texts, tokenizer, model, max_batch=32, buckets=BUCKETS, stats=None):
+    """
+    Class probabilities for a list of (already cleaned) texts, shape (len(texts), 3).
+    Forward passes are length-bucketed, max_batch windows each; long texts are windowed.
+    """
+    if not texts:
+        return np.empty((0, len(LABELS)), dtype=np.float32)
+    size = MAX_LENGTH - tokenizer.num_special_tokens_to_add(pair=False)
+    ids = tokenizer(list(texts), add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+    windows = []                                    # (text index, token ids with specials)
+    for i, text_ids in enumerate(ids):
+        parts = _windows(text_ids, size, size - WINDOW_OVERLAP)
+        if stats is not None and len(parts) > 1:
+            stats.long_texts += 1
+        windows.extend((i, tokenizer.build_inputs_with_special_tokens(p)) for p in parts)
+    windows.sort(key=lambda w: len(w[1]))
+
+    target = getattr(model, "device", device)
+    pad_id = tokenizer.pad_token_id
+    logits_sum = np.zeros((len(texts), len(LABELS)), dtype=np.float64)
+    weight = np.zeros(len(texts), dtype=np.float64)
+    start = 0
+    while start < len(windows):
+        bucket = next((b for b in buckets if b >= len(windows[start][1])), MAX_LENGTH)
+        end = start
+        while end < len(windows) and end - start < max_batch and len(windows[end][1]) <= bucket:
+            end += 1
+        batch = windows[start:end]
+        width = len(batch[-1][1])                   # sorted: the last one is the longest
+        input_ids = torch.full((len(batch), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+        for row, (_, w) in enumerate(batch):
+            input_ids[row, :len(w)] = torch.tensor(w)
+            attention_mask[row, :len(w)] = 1
+        t0 = time.perf_counter()
+        with torch.inference_mode():
+            logits = model(input_ids=input_ids.to(target), attention_mask=attention_mask.to(target)).logits
+        logits = logits.float().cpu().numpy()
+        if stats is not None:
+            stats.record(bucket, len(batch), int(attention_mask.sum()), len(batch) * width,
+                         time.perf_counter() - t0)
+        for (i, w), row in zip(batch, logits):
+            logits_sum[i] += len(w) * row
+            weight[i] += len(w)
+        start = end
+
+    logits = torch.from_numpy(logits_sum / weight[:, None])
+    return torch.softmax(logits, dim=-1).numpy().astype(np.float32)
+
+def scores_to_result(scores):
+    """(sentiment label, {label: rounded probability}) for one row of probabilities."""
+    results = {label: round(float(score), 4) for label, score in zip(LABELS, scores)}
+    return LABELS[int(scores.argmax())], results
+
+# -------------------- Sentiment Analysis --------------------
+def analyze_sentiment(text, tokenizer, model):
+    """Analyze sentiment of given text (supports emojis)."""
+    return scores_to_result(predict_batch([clean_text(text)], tokenizer, model)[0])
+
+def combine_sentence_scores(sentence_scores):
+    """
+    Approximate document probabilities from per-sentence ones: the length-weighted mean
+    of the sentences' log-probabilities (= their logits up to a per-row constant), softmaxed.
+    """
+    weights = np.array([max(len(s), 1) for s, _ in sentence_scores], dtype=np.float64)
+    log_probs = np.log(np.clip(np.stack([p for _, p in sentence_scores]), 1e-9, 1.0))
+    mean = weights @ log_probs / weights.sum()
+    probs = np.exp(mean - mean.max())
+    return (probs / probs.sum()).astype(np.float32)
+
+def most_influential_sentence(sentence_scores):
+    """(sentence, probabilities, label) with the largest |positive - negative| gap."""
+    sentence, scores = max(sentence_scores, key=lambda x: abs(x[1][2] - x[1][0]))
+    return sentence, scores, LABELS[int(scores.argmax())]
+
+# -------------------- Bucket tuning report --------------------
+def main():
+    """Padding waste and per-bucket latency for a text file, to tune BUCKETS."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Report padding waste / latency per length bucket.")
+    parser.add_argument("texts", help="text file, one review per line")
+    parser.add_argument("--buckets", default=",".join(map(str, BUCKETS)))
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+
+    with open(args.texts, encoding="utf-8") as f:
+        texts = [clean_text(line) for line in f if line.strip()]
+    buckets = tuple(int(b) for b in args.buckets.split(","))
+    tokenizer, model = load_roberta_model()
+    lengths = [min(len(ids), MAX_LENGTH) for ids in tokenizer(texts, verbose=False)["input_ids"]]
+    naive = sum(max(lengths[i:i + args.max_batch]) * len(lengths[i:i + args.max_batch])
+                for i in range(0, len(lengths), args.max_batch))
+
+    stats = BucketStats()
+    t0 = time.perf_counter()
+    predict_batch(texts, tokenizer, model, max_batch=args.max_batch, buckets=buckets, stats=stats)
+    elapsed = time.perf_counter() - t0
+    report = stats.report()
+    print(f"{len(texts)} texts in {elapsed:.2f}s, {report['long_texts']} split into windows")
+    print(f"padding waste: {report['padding_waste']:.1%} bucketed vs {1 - sum(lengths) / naive:.1%} "
+          f"in input order (truncated at {MAX_LENGTH})\n")
+    print(f"{'bucket':<8}{'windows':>9}{'batches':>9}{'waste':>8}{'ms/batch':>10}")
+    for bucket, b in report["buckets"].items():
+        print(f"{bucket:<8}{b['windows']:>9}{b['batches']:>9}{b['padding_waste']:>8.1%}{b['ms_per_batch']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Headless HTTP/JSON sentiment endpoint (aiohttp), pre-fork.
+
+With the fp32 torch backend on the CPU the parent loads the weights once, binds the
+listening socket and forks N workers. The parent never runs a forward pass, so no
+torch thread pool exists before the fork; the workers share the parent's weight pages
+copy-on-write instead of holding N copies and each sets its own torch thread count.
+The int8 and onnx backends (and CUDA) are not shared: quantization runs torch ops and
+onnxruntime sessions own thread pools, neither of which survives a fork, so each worker
+builds its own after the fork (with onnx the export is made once by a short-lived child
+before the workers start). Each worker runs an asyncio server in front of its own
+SentimentService (micro-batching + score cache). At most --max-pending texts may be
+waiting per worker; beyond that requests get 503 with Retry-After instead of piling
+up. A worker that dies is replaced; if one dies within START_GRACE_S of starting, the
+server shuts down instead of restarting it in a loop.
+
+    python sentiment_server.py --port 8000 --workers 4 --threads 2
+
+    POST /v1/sentiment  {"text": "..."}                      -> {"sentiment", "scores"}
+                        {"texts": ["...", ...]}              -> {"results": [...]}
+                        add "sentences": true for per-sentence scores + most influential sentence
+    GET  /healthz, GET /stats
+
+Load test: python loadgen.py --url http://127.0.0.1:8000 --concurrency 1,8,32,128
+"""
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from aiohttp import web
+
+from model_artifacts import ensure_nltk_data
+from sentiment_backends import DEFAULT_BACKEND
+from sentiment_cache import SentimentCache
+from sentiment_model import LABELS, MODEL_PATH, device, load_roberta_model, model_version, most_influential_sentence
+from sentiment_service import SentimentService
+
+MAX_TEXTS = 256               # per request
+MAX_TEXT_CHARS = 20_000
+START_GRACE_S = 10.0          # a worker dying sooner than this after its fork stops the server
+
+
+# -------------------- Handlers --------------------
+def _result(probs):
+    return {"sentiment": LABELS[int(probs.argmax())],
+            "scores": {label: round(float(p), 4) for label, p in zip(LABELS, probs)}}
+
+
+def _bad_request(message):
+    return web.json_response({"error": message}, status=400)
+
+
+async def analyze(request):
+    app = request.app
+    try:
+        payload = await request.json()
+    except ValueError:
+        return _bad_request("body must be JSON")
+    if not isinstance(payload, dict):
+        return _bad_request('send {"text": str} or {"texts": [str, ...]}')
+    single = "text" in payload
+    texts = [payload["text"]] if single else payload.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        return _bad_request('send {"text": str} or {"texts": [str, ...]}')
+    if len(texts) > MAX_TEXTS or any(len(t) > MAX_TEXT_CHARS for t in texts):
+        return _bad_request(f"at most {MAX_TEXTS} texts of {MAX_TEXT_CHARS} characters each")
+
+    with_sentences = bool(payload.get("sentences"))
+    if with_sentences:
+        from nltk import sent_tokenize
+        sentences = [sent_tokenize(t) for t in texts]
+    else:
+        sentences = [[] for _ in texts]
+
+    cost = len(texts) + sum(len(s) for s in sentences)
+    if app["pending"] + cost > app["max_pending"]:
+        app["rejected"] += 1
+        return web.json_response({"error": "overloaded, retry shortly"}, status=503, headers={"Retry-After": "1"})
+
+    service = app["service"]
+    app["pending"] += cost
+    try:
+        docs = [asyncio.wrap_future(service.submit(t)) for t in texts]
+        parts = [[asyncio.wrap_future(service.submit(s, clean=False)) for s in sents] for sents in sentences]
+        doc_probs = await asyncio.gather(*docs)
+        results = []
+        for probs, sents, futures in zip(doc_probs, sentences, parts):
+            result = _result(probs)
+            if with_sentences and sents:
+                sentence_scores = list(zip(sents, await asyncio.gather(*futures)))
+                sentence, scores, label = most_influential_sentence(sentence_scores)
+                result["sentences"] = [{"text": s, **_result(p)} for s, p in sentence_scores]
+                result["most_influential"] = {"text": sentence, "sentiment": label}
+            results.append(result)
+    finally:
+        app["pending"] -= cost
+    return web.json_response(results[0] if single else {"results": results})
+
+
+async def healthz(request):
+    return web.json_response({"ok": True, "pid": os.getpid()})
+
+
+async def stats(request):
+    app = request.app
+    return web.json_response({"pid": os.getpid(), "pending": app["pending"], "rejected": app["rejected"],
+                              **app["service"].stats()})
+
+
+def create_app(service, max_pending):
+    app = web.Application(client_max_size=MAX_TEXTS * MAX_TEXT_CHARS * 4)
+    app["service"] = service
+    app["max_pending"] = max_pending
+    app["pending"] = app["rejected"] = 0
+    app.router.add_post("/v1/sentiment", analyze)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+# -------------------- Pre-fork --------------------
+def run_worker(sock, args, preloaded=None):
+    """preloaded: (tokenizer, model) loaded by the parent before the fork, else loaded here."""
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    tokenizer, model = preloaded or load_roberta_model()
+    cache = SentimentCache(model_version()) if args.cache else None
+    service = SentimentService(tokenizer, model, args.max_batch, args.max_wait_ms, args.threads, cache=cache)
+    web.run_app(create_app(service, args.max_pending), sock=sock, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork HTTP sentiment server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="forked worker processes (0 = serve from this process)")
+    parser.add_argument("--threads", type=int, default=2, help="torch threads per worker")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-pending", type=int, default=512, help="queued texts per worker before 503")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="disable the score cache")
+    args = parser.parse_args()
+
+    ensure_nltk_data(MODEL_PATH)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+    print(f"Serving on http://{args.host}:{args.port} with {max(args.workers, 1)} worker(s)")
+
+    if args.workers <= 0 or not hasattr(os, "fork"):
+        run_worker(sock, args)
+        return
+    # fp32 on the CPU is plain tensors: load once here and share with the workers
+    preloaded = load_roberta_model() if DEFAULT_BACKEND == "torch" and device.type == "cpu" else None
+
+    def fork(target):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                target()
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        return pid
+
+    if DEFAULT_BACKEND == "onnx":     # export once, not once per worker
+        _, status = os.waitpid(fork(load_roberta_model), 0)
+        if status:
+            sys.exit("ONNX export failed")
+
+    gc.freeze()         # keep the GC from touching (and so copying) the parent's objects in children
+    children = {}       # pid -> fork time
+    for _ in range(args.workers):
+        children[fork(lambda: run_worker(sock, args, preloaded))] = time.monotonic()
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        if time.monotonic() - started < START_GRACE_S:
+            print(f"Worker {pid} died during start-up (status {status}); shutting down", file=sys.stderr)
+            stop()
+            continue
+        print(f"Worker {pid} exited (status {status}); starting a new one", file=sys.stderr)
+        children[fork(lambda: run_worker(sock, args, preloaded))] = time.monotonic()
+
+
+if __name__ == "__main__":
+    main()
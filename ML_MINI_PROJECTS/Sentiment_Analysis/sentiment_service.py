@@ -0,0 +1,172 @@
+"""
+Micro-batching inference service for the RoBERTa sentiment model.
+
+Concurrent callers submit single texts; a worker thread groups whatever
+arrives within `max_wait_ms` (up to `max_batch_size` texts) into one padded
+forward pass and hands each caller its own result. With a SentimentCache, texts
+scored before resolve at submit time without queueing.
+
+Throughput check (texts/s, batched vs one-at-a-time):
+    python sentiment_service.py --texts 512 --clients 16
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+from sentiment_model import BucketStats, clean_text, predict_batch, scores_to_result
+
+DEFAULT_THREADS = int(os.environ.get("SENTIMENT_TORCH_THREADS", "0"))   # 0 = torch default
+log = logging.getLogger(__name__)
+
+
+class SentimentService:
+    def __init__(self, tokenizer, model, max_batch_size=32, max_wait_ms=10.0, num_threads=DEFAULT_THREADS,
+                 cache=None):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.texts_done = self.batches_done = 0
+        self.busy_s = 0.0
+        self.bucket_stats = BucketStats()
+        self.cache = cache              # optional sentiment_cache.SentimentCache
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    # -------------------- Client API --------------------
+    def submit(self, text, clean=True, lookup=True):
+        """
+        Queue one text; the Future resolves to its class probabilities (np.ndarray of 3).
+        lookup=False skips the cache lookup (for callers that already checked the cache).
+        """
+        future = Future()
+        text = clean_text(text) if clean else text
+        if self.cache is not None and lookup:
+            try:
+                hit = self.cache.get_many([text]).get(0)
+            except Exception:           # e.g. sqlite3.OperationalError: the model still answers
+                log.exception("Sentiment cache lookup failed")
+                hit = None
+            if hit is not None:         # cached: resolved immediately, never queued
+                future.set_result(hit)
+                return future
+        self._queue.put((text, future))
+        return future
+
+    def analyze(self, text, timeout=None):
+        """(sentiment, scores) for one raw text."""
+        return scores_to_result(self.submit(text).result(timeout))
+
+    def analyze_many(self, texts, timeout=None):
+        futures = [self.submit(t) for t in texts]
+        return [scores_to_result(f.result(timeout)) for f in futures]
+
+    def stats(self):
+        return {"texts": self.texts_done, "batches": self.batches_done,
+                "mean_batch": self.texts_done / self.batches_done if self.batches_done else 0.0,
+                "texts_per_s": self.texts_done / self.busy_s if self.busy_s else 0.0,
+                "buckets": self.bucket_stats.report(),
+                "cache": self.cache.stats() if self.cache is not None else None}
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    # -------------------- Worker --------------------
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)    # finish this batch, stop on the next round
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        # nothing in here may end the thread early: every queued Future gets a result or an exception
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [text for text, _ in batch]
+            t0 = time.perf_counter()
+            try:
+                probs = predict_batch(texts, self.tokenizer, self.model, max_batch=self.max_batch_size,
+                                      stats=self.bucket_stats)
+            except Exception as e:
+                log.exception("Sentiment batch of %d texts failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.busy_s += time.perf_counter() - t0
+            self.texts_done += len(batch)
+            self.batches_done += 1
+            for (_, future), row in zip(batch, probs):
+                if not future.done():
+                    future.set_result(row)
+            if self.cache is not None:
+                try:
+                    self.cache.put_many(texts, probs)
+                except Exception:       # e.g. "database is locked": the scores were delivered anyway
+                    log.exception("Writing %d scores to the sentiment cache failed", len(texts))
+
+
+def main():
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+    from sentiment_model import analyze_sentiment, load_roberta_model
+
+    parser = argparse.ArgumentParser(description="Measure batched vs unbatched sentiment throughput.")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent callers")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="torch CPU threads")
+    args = parser.parse_args()
+
+    tokenizer, model = load_roberta_model()
+    samples = ["I love this product!", "Worst purchase ever, it broke after a day.",
+               "It is okay, nothing special.", "Delivery was fast but the box was damaged."]
+    texts = [samples[i % len(samples)] + f" #{i}" for i in range(args.texts)]
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(lambda t: analyze_sentiment(t, tokenizer, model), texts))
+    single = args.texts / (time.perf_counter() - t0)
+
+    service = SentimentService(tokenizer, model, args.max_batch, args.max_wait_ms, args.threads)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(service.analyze, texts))
+    batched = args.texts / (time.perf_counter() - t0)
+    stats = service.stats()
+    service.close()
+
+    print(f"one-at-a-time : {single:8.1f} texts/s")
+    print(f"micro-batched : {batched:8.1f} texts/s  (mean batch {stats['mean_batch']:.1f}, x{batched / single:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from incremental_analysis import analyze_incremental
+from sentiment_model import combine_sentence_scores
+
+
+def fake_probs(text):
+    p = np.array([len(text) % 5 + 1, 2.0, text.count("good") + 1.0], dtype=np.float32)
+    return p / p.sum()
+
+
+class FakeCache:
+    def __init__(self):
+        self.scores = {}
+
+    def get_many(self, texts):
+        return {i: self.scores[t] for i, t in enumerate(texts) if t in self.scores}
+
+
+class FakeService:
+    """Resolves every submitted text at once and remembers it, like SentimentService + cache."""
+
+    def __init__(self):
+        self.cache = FakeCache()
+        self.submitted = []
+
+    def submit(self, text, clean=True, lookup=True):
+        self.submitted.append(text)
+        self.cache.scores[text] = fake_probs(text)
+        future = Future()
+        future.set_result(self.cache.scores[text])
+        return future
+
+
+def test_only_changed_sentences_are_resubmitted():
+    service = FakeService()
+    sentences = ["The screen is good.", "Battery is weak.", "Shipping was slow."]
+    *_, n_new = analyze_incremental(service, " ".join(sentences), sentences)
+    assert n_new == 3
+
+    service.submitted.clear()
+    edited = ["The screen is good.", "Battery is fine.", "Shipping was slow."]
+    *_, sentence_scores, n_new = analyze_incremental(service, " ".join(edited), edited)
+    assert service.submitted == ["Battery is fine."]
+    assert n_new == 1
+    assert [s for s, _ in sentence_scores] == edited
+
+
+def test_repeated_sentences_are_scored_once():
+    service = FakeService()
+    *_, n_new = analyze_incremental(service, "a. a. b.", ["a.", "a.", "b."])
+    assert service.submitted == ["a.", "b."]
+    assert n_new == 2
+
+
+def test_approximate_document_score_comes_from_the_sentences():
+    service = FakeService()
+    sentences = ["good good.", "bad."]
+    sentiment, scores, sentence_scores, _ = analyze_incremental(service, "good good. bad.", sentences)
+    assert "good good. bad." not in service.submitted
+    expected = combine_sentence_scores(sentence_scores)
+    assert np.allclose(list(scores.values()), expected, atol=1e-4)
+
+
+def test_exact_document_score_comes_from_the_model():
+    service = FakeService()
+    sentiment, scores, _, _ = analyze_incremental(service, "good good. bad.", ["good good.", "bad."],
+                                                  exact_document=True)
+    assert service.submitted[0] == "good good. bad."
+    assert np.allclose(list(scores.values()), fake_probs("good good. bad."), atol=1e-4)
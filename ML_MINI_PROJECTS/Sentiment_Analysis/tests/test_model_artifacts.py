@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+import model_artifacts
+
+
+@pytest.fixture
+def root(tmp_path):
+    os.makedirs(tmp_path / "model")
+    (tmp_path / "model" / "weights.safetensors").write_bytes(b"w" * 4096)
+    (tmp_path / "model" / "config.json").write_text("{}")
+    files = {rel: {"sha256": model_artifacts._sha256(path), "size": os.path.getsize(path)}
+             for rel, path in model_artifacts._artifact_files(str(tmp_path))}
+    (tmp_path / "manifest.json").write_text(json.dumps({"model_name": "test", "files": files}))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    calls = []
+    sha256 = model_artifacts._sha256
+    monkeypatch.setattr(model_artifacts, "_sha256", lambda path: calls.append(path) or sha256(path))
+    return calls
+
+
+def test_loads_hash_only_after_a_change(root, hashed):
+    model_artifacts.quick_verify(root)
+    assert len(hashed) == 2                 # first load on this machine: full check
+    model_artifacts.quick_verify(root)
+    assert len(hashed) == 2                 # unchanged: size + mtime only
+
+    weights = os.path.join(root, "model", "weights.safetensors")
+    st = os.stat(weights)
+    os.utime(weights, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))     # copied / touched
+    model_artifacts.quick_verify(root)
+    assert len(hashed) == 4
+
+
+def test_modified_weights_are_rejected(root):
+    model_artifacts.quick_verify(root)
+    weights = os.path.join(root, "model", "weights.safetensors")
+    st = os.stat(weights)
+    with open(weights, "r+b") as f:
+        f.write(b"x")                       # same size
+    os.utime(weights, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    with pytest.raises(ValueError, match="checksum mismatch model/weights.safetensors"):
+        model_artifacts.quick_verify(root)
+
+
+def test_missing_file_is_rejected(root):
+    os.remove(os.path.join(root, "model", "config.json"))
+    with pytest.raises(ValueError, match="missing model/config.json"):
+        model_artifacts.quick_verify(root)
+
+
+def test_verify_always_hashes(root, hashed):
+    model_artifacts.verify(root)
+    model_artifacts.verify(root)
+    assert len(hashed) == 4
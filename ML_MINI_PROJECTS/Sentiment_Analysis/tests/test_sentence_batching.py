@@ -0,0 +1,55 @@
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from sentiment_model import predict_batch
+from sentiment_service import SentimentService
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer with RoBERTa's <s> ... </s> specials and pad id 1."""
+    pad_token_id = 1
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [0] + list(ids) + [2]
+
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": [[3 + zlib.crc32(w.encode()) % 997 for w in t.split()] for t in texts]}
+
+
+class FakeModel(torch.nn.Module):
+    """Logits = masked mean of per-token embeddings, so padding never changes a row."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embedding = torch.nn.Embedding(1000, 3)
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).float()
+        logits = (self.embedding(input_ids) * mask).sum(1) / mask.sum(1)
+        return SimpleNamespace(logits=logits)
+
+
+def test_sentences_batched_with_the_document_match_single_passes():
+    tokenizer, model = FakeTokenizer(), FakeModel().eval()
+    sentences = ["great phone", "the battery died after two days of light use", "ok", "would not buy again"]
+    service = SentimentService(tokenizer, model, max_batch_size=8, max_wait_ms=50)
+    try:
+        doc = service.submit(" ".join(sentences), clean=False)
+        parts = [service.submit(s, clean=False) for s in sentences]
+        batched = [f.result(5) for f in parts]
+        doc.result(5)
+    finally:
+        service.close()
+    assert service.batches_done < len(sentences) + 1            # shared forward passes
+    for sentence, probs in zip(sentences, batched):
+        assert np.allclose(probs, predict_batch([sentence], tokenizer, model)[0], atol=1e-6)
@@ -0,0 +1,72 @@
+import numpy as np
+
+from sentiment_cache import SentimentCache, predict_cached
+
+PROBS = np.array([[0.1, 0.2, 0.7], [0.6, 0.3, 0.1]], dtype=np.float32)
+
+
+def test_scores_survive_reopening(tmp_path):
+    path = str(tmp_path / "scores.db")
+    cache = SentimentCache("v1", path)
+    cache.put_many(["good", "bad"], PROBS)
+    cache.close()
+    found = SentimentCache("v1", path).get_many(["bad", "good", "other"])
+    assert sorted(found) == [0, 1]
+    assert np.allclose(found[0], PROBS[1])
+
+
+def test_versions_share_one_database_without_wiping(tmp_path):
+    path = str(tmp_path / "scores.db")
+    torch_cache = SentimentCache("torch", path)
+    torch_cache.put_many(["good"], PROBS[:1])
+    onnx_cache = SentimentCache("onnx", path)
+    assert onnx_cache.get_many(["good"]) == {}        # never reads another version's rows
+    onnx_cache.put_many(["good"], PROBS[1:])
+    assert np.allclose(SentimentCache("torch", path).get_many(["good"])[0], PROBS[0])
+    assert np.allclose(SentimentCache("onnx", path).get_many(["good"])[0], PROBS[1])
+
+
+def test_predict_cached_runs_only_distinct_misses():
+    cache = SentimentCache("v1", path=None)
+    calls = []
+
+    def predict(texts):
+        calls.append(list(texts))
+        return np.tile(PROBS[0], (len(texts), 1))
+
+    predict_cached(["a", "b", "a"], cache, predict)
+    out = predict_cached(["a", "c"], cache, predict)
+    assert calls == [["a", "b"], ["c"]]
+    assert out.shape == (2, 3)
+
+
+def test_trim_keeps_recently_used_entries(tmp_path):
+    path = str(tmp_path / "scores.db")
+    cache = SentimentCache("v1", path, max_memory=1)
+    cache.put_many(["early"], PROBS[:1])
+    cache.put_many(["a", "b"], PROBS)
+    cache.get_many(["early"])                       # hot entry inserted first
+    cache.close()
+    trimmed = SentimentCache("v1", path, max_disk=1)
+    assert sorted(trimmed.get_many(["early", "a", "b"])) == [0]
+
+
+def test_disk_level_is_trimmed_while_in_use(tmp_path):
+    cache = SentimentCache("v1", str(tmp_path / "scores.db"), max_disk=5)
+    cache.TRIM_EVERY = 4
+    for i in range(10):
+        cache.put_many([f"text {i}"], PROBS[:1])
+    # trimmed back to 5 after the 8th insert, then two more
+    assert cache._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] == 7
+
+
+def test_databases_without_last_use_column_are_upgraded(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "scores.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE scores (key BLOB PRIMARY KEY, probs BLOB NOT NULL)")
+    conn.commit()
+    conn.close()
+    cache = SentimentCache("v1", path)
+    cache.put_many(["good"], PROBS[:1])
+    assert 0 in cache.get_many(["good"])
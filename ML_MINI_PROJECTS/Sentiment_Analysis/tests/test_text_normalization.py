@@ -0,0 +1,67 @@
+import random
+
+import emoji
+import pytest
+
+from text_normalization import _legacy, clean_text, emoji_to_text, is_only_emoji, normalize, normalize_many
+
+
+def legacy_only_emoji(text):
+    return not text or emoji.replace_emoji(text, replace="").strip() == ""
+
+
+def squash(text):
+    """Emoji-only output used to glue the names together ('keycap_1keycap_2'); now they are spaced."""
+    return "".join(text.split())
+
+
+def assert_same_as_legacy(text):
+    if legacy_only_emoji(text):
+        assert is_only_emoji(text), text
+        assert squash(normalize(text)) == squash(_legacy(text)), text
+    else:
+        assert not is_only_emoji(text), text
+        assert normalize(text) == _legacy(text), text
+
+
+def test_every_single_emoji_matches_legacy():
+    for e in emoji.EMOJI_DATA:
+        assert_same_as_legacy(e)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("1️⃣", "keycap_1"),
+    ("1⃣ #️⃣", "keycap_1 keycap_#"),
+    ("👨‍👩‍👧", "family_man_woman_girl"),
+    ("👍🏽", "thumbs_up_medium_skin_tone"),
+    ("🇫🇷", "France"),
+    ("😍😍", "smiling_face_with_heart-eyes smiling_face_with_heart-eyes"),
+])
+def test_emoji_only_sequences(text, expected):
+    assert is_only_emoji(text)
+    assert normalize(text) == emoji_to_text(text) == expected
+    assert_same_as_legacy(text)
+
+
+@pytest.mark.parametrize("text", ["1", "1 2", "#1", "1️⃣ abc", "👍 1", "Love it 😍 http://x.co",
+                                  "#salehttp://x.co", "@userwww.x.com #tag", "##www.", "#http"])
+def test_mixed_text_matches_legacy(text):
+    assert_same_as_legacy(text)
+
+
+def test_random_corpus_matches_legacy():
+    rng = random.Random(0)
+    tokens = ["#", "@", "http", "http://", "www", "www.", "a", "b1", "_", "😍", "1️⃣", "2⃣", " ", "  ", ".", ",",
+              "x.co", "\n", "é", "👨‍👩‍👧", "🇫🇷", ":", "great", "👍🏽"]
+    for _ in range(20000):
+        assert_same_as_legacy("".join(rng.choice(tokens) for _ in range(rng.randint(0, 12))))
+
+
+def test_clean_text_and_batches():
+    assert clean_text("  Hi @bob #tag www.x.com ok  ") == "Hi    ok"
+    assert normalize_many(["😍", "", None, "a http://x"]) == ["smiling_face_with_heart-eyes", "", "", "a"]
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(["😍", None, "a #b"], index=[10, 11, 12])
+    out = normalize_many(series)
+    assert list(out.index) == [10, 11, 12]
+    assert list(out) == ["smiling_face_with_heart-eyes", "", "a"]
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+import translation
+from translation import TranslationCache, Translator, looks_english
+
+SHORT_NON_ENGLISH = ["muy bueno", "sehr schlecht", "très bien", "molto bene", "muito bom", "heel goed",
+                     "no me gusta", "was ist das", "c'est nul", "Das ist sehr gut"]
+ENGLISH = ["great!", "love it", "I love this product!", "It is okay, nothing special.",
+           "Terrible. Would not recommend to anyone.", "Delivery was fast but the box was damaged."]
+
+
+@pytest.mark.parametrize("text", SHORT_NON_ENGLISH)
+def test_short_non_english_is_not_taken_for_english(text):
+    assert not looks_english(text)
+
+
+@pytest.mark.parametrize("text", ENGLISH)
+def test_english_is_recognized(text):
+    assert looks_english(text)
+
+
+@pytest.mark.parametrize("text", ["Meh.", "ok", "Produkt"])
+def test_no_evidence_means_translate(text):
+    assert not looks_english(text)
+
+
+def test_non_latin_script_and_symbols():
+    assert not looks_english("Отличный товар")
+    assert not looks_english("非常好")
+    assert looks_english("👍👍 100%")
+
+
+@pytest.fixture
+def translator(tmp_path, monkeypatch):
+    sent = []
+
+    def backend(texts):
+        sent.append(list(texts))
+        return [f"EN({t})" for t in texts]
+
+    monkeypatch.setitem(translation._BACKEND_FUNCS, "google", backend)
+    t = Translator("google", cache_path=str(tmp_path / "translations.db"))
+    t.sent = sent
+    yield t
+    t.cache.close()
+
+
+def test_short_non_english_reaches_the_backend(translator):
+    assert translator.translate_many(["muy bueno", "I love it", "muy bueno", "sehr schlecht"]) == \
+        ["EN(muy bueno)", "I love it", "EN(muy bueno)", "EN(sehr schlecht)"]
+    assert translator.sent == [["muy bueno", "sehr schlecht"]]
+
+
+def test_translations_are_memoized(translator, tmp_path):
+    translator.translate_many(["muy bueno"])
+    assert translator.translate("muy bueno") == "EN(muy bueno)"
+    assert len(translator.sent) == 1 and translator.cache_hits == 1
+
+    reopened = Translator("google", cache_path=str(tmp_path / "translations.db"))
+    assert reopened.translate("muy bueno") == "EN(muy bueno)"
+    assert len(translator.sent) == 1
+    reopened.cache.close()
+
+
+def test_backend_failure_keeps_the_original_or_raises(translator, monkeypatch):
+    def down(texts):
+        raise ConnectionError("offline")
+
+    monkeypatch.setitem(translation._BACKEND_FUNCS, "google", down)
+    assert translator.translate_many(["muy bueno"]) == ["muy bueno"]
+    with pytest.raises(ConnectionError):
+        translator.translate("muy bueno")
+
+
+def test_memo_is_trimmed_periodically_least_recently_used_first(tmp_path):
+    cache = TranslationCache(str(tmp_path / "memo.db"), max_entries=3)
+    cache.TRIM_EVERY = 4
+    for key in (b"old", b"a", b"b"):
+        cache.put_many([(key, key.decode())])
+        time.sleep(0.01)
+    assert len(cache) == 3                          # no trim yet, bound not exceeded
+    cache.get_many([b"old"])                        # recently used: survives the trim
+    cache.put_many([(b"c", "c")])
+    assert len(cache) == 3
+    assert set(cache.get_many([b"old", b"a", b"b", b"c"])) == {b"old", b"b", b"c"}
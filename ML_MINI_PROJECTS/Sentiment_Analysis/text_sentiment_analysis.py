@@ -1,55 +1,40 @@
 # -------------------- Import Required Libraries --------------------
+import logging
 import os
-import re
 import time
-import nltk
-import torch
-import emoji
 from nltk import sent_tokenize
 import streamlit as st
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from scipy.special import softmax
-from deep_translator import GoogleTranslator
-
-nltk.download("punkt", quiet=True)
-nltk.download("punkt_tab", quiet=True)
-# -------------------- Setup Model Directory --------------------
-MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
-MODEL_PATH = "./saved_roberta_model"
-
-# -------------------- Setup Device --------------------
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-# -------------------- Text Cleaning --------------------
-def clean_text(text):
-    """Remove URLs, hashtags, mentions, and extra spaces."""
-    text = re.sub(r"http\S+|www\S+", "", text)
-    text = re.sub(r"@\w+|#\w+", "", text)
-    text = text.strip()
-    return text
+from model_artifacts import ensure_nltk_data
+from sentiment_cache import SentimentCache
+from sentiment_model import MODEL_PATH, emoji_to_text, model_version, most_influential_sentence
+from sentiment_model import load_roberta_model as _load_roberta_model
+from sentiment_service import SentimentService
+from translation import Translator
+from incremental_analysis import analyze_incremental
+
+log = logging.getLogger(__name__)
 
 # -------------------- Load Model --------------------
 @st.cache_resource
-def load_roberta_model():
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
-    model = model.to(device)
-    return tokenizer, model
+def load_nltk_data():
+    """Sentence tokenizer data from the local artefacts (downloaded only if there are none)."""
+    ensure_nltk_data(MODEL_PATH)
 
-# -------------------- Sentiment Analysis --------------------
-def analyze_sentiment(text, tokenizer, model):
-    """Analyze sentiment of given text (supports emojis)."""
-    text = clean_text(text)
-    encoded_text = tokenizer(text, return_tensors='pt', truncation=True, max_length=512).to(device)
+@st.cache_resource
+def load_roberta_model():
+    return _load_roberta_model()
 
-    with torch.no_grad():
-        output = model(**encoded_text)
+@st.cache_resource
+def get_sentiment_service():
+    """One micro-batching service per server process, shared by all sessions."""
+    tokenizer, model = load_roberta_model()
+    cache = SentimentCache(model_version())
+    return SentimentService(tokenizer, model, max_batch_size=32, max_wait_ms=10, cache=cache)
 
-    scores = softmax(output.logits[0].detach().cpu().numpy())
-    labels = ['Negative', 'Neutral', 'Positive']
-    results = {label: round(float(score), 4) for label, score in zip(labels, scores)}
-    sentiment = labels[scores.argmax()]
-    return sentiment, results
+@st.cache_resource
+def get_translator():
+    """English pass-through + persistent memo in front of the translation backend."""
+    return Translator()
 
 
 # -------------------- Streamlit UI Setup --------------------
@@ -171,84 +156,111 @@ footer { visibility: hidden; }
 
 
 # -------------------- Load Model --------------------
-tokenizer, model = load_roberta_model()
-# ---------------------checking if the input contains only emojis or not---------------------------
-def is_only_emoji(text):
-    no_emoji_text = emoji.replace_emoji(text,replace="").strip()
-    return len(no_emoji_text)==0
-
+load_nltk_data()
+get_sentiment_service()
 # -------------------- Title --------------------
 st.title("💫 Welcome to Sentiment Analyzer App")
 st.write("""This app analyzes the **sentiment** of your text Instantly 😊""")
 
-user_input = st.text_area( "✏️ Enter your Review or Comment to Analyze:", placeholder="🔍Type something like — 'I love this product!'", height=150)
+DEBOUNCE_S = 0.8      # live mode: analyse only once the submitted text has stayed the same this long
 
-# ------------converting emoji into the related text------------------
-if is_only_emoji(user_input):
-    print("Input contains emojis")
-    result = emoji.demojize(user_input,language='en')
-    print(result)
-    user_input = re.sub(r':','',result)
-    
-# -------------------- Translation Safety -------------------- 
-translated_text = None 
-if user_input and user_input.strip():
-    try:
-        translated_text = GoogleTranslator(source='auto', target='en').translate(user_input)
-        st.write(translated_text)
-    except Exception as e:
-        st.warning("⚠️ Please check your internet connection.But Don’t worry — we analyzed your text directly.")
-        translated_text = user_input
+user_input = st.text_area( "✏️ Enter your Review or Comment to Analyze:", placeholder="🔍Type something like — 'I love this product!'", height=150,
+                           key="review")
+live = st.toggle("⚡ Live analysis (re-scores only the sentences you change)", value=False)
 
-else:
+# ------------converting emoji into the related text------------------
+user_input = emoji_to_text(user_input)
+
+# -------------------- Analysis --------------------
+def run_analysis(text, exact_document):
+    """Everything the results section shows, as a dict (no Streamlit calls)."""
+    result = {"translated": None, "translation_failed": False}
+    # -------------------- Translation Safety -------------------- 
+    # only when analysing (not on every rerun); English text and repeats never hit the network
     translated_text = ""
+    if text and text.strip():
+        try:
+            translated_text = get_translator().translate(text)
+            if translated_text != text:
+                result["translated"] = translated_text
+        except Exception as e:
+            log.warning("Translation failed, analysing the original text: %s", e)
+            result["translation_failed"] = True
+            translated_text = text
 
-# -------------------- Analyze Button -------------------- 
-if st.button("🔍 Analyze Sentiment"): 
-    st.toast("⏳ Analyzing sentiment... please wait 😊")
-    time.sleep(0.1)
-    
     if not translated_text or translated_text.strip() == "": 
+        result["empty"] = True
+        return result
+
+    # ---------finding the sentence which influenced the sentiment------------------
+    # sentences scored before (by anyone) come from the service's cache; the rest are batched together
+    service = get_sentiment_service()
+    sentences = sent_tokenize(translated_text)
+    sentiment, scores, sentiment_scores, n_new = analyze_incremental(service, translated_text, sentences,
+                                                                     exact_document=exact_document)
+
+    # Find sentence with maximum sentiment change
+    max_change_sentence, max_change_scores, sentence_sentiment = most_influential_sentence(sentiment_scores)
+    result.update(sentiment=sentiment, scores=scores, sentence=max_change_sentence,
+                  sentence_sentiment=sentence_sentiment, n_new=n_new, approximate=not exact_document,
+                  n_reused=len(set(sentences)) - n_new, hit_rate=service.cache.stats()["hit_rate"])
+    return result
+
+# -------------------- Results --------------------
+def show_result(result):
+    if result["translated"]:
+        st.write(result["translated"])
+    if result["translation_failed"]:
+        st.warning("⚠️ Please check your internet connection.But Don’t worry — we analyzed your text directly.")
+    if result.get("empty"):
         st.warning("⚠️ Please enter some text before analyzing.") 
-    else: 
-        with st.spinner("⏳ Analyzing sentiment... please wait 😊"):
-            time.sleep(0.5)
-            sentiment, scores = analyze_sentiment(translated_text, tokenizer, model) 
-
-            # ---------finding the sentence which influenced the sentiment------------------
-            sentences = sent_tokenize(translated_text)
-            sentiment_scores = []
-
-            for s in sentences:
-                inputs = tokenizer(s, return_tensors="pt", truncation=True, max_length=512).to(device)
-                outputs = model(**inputs)
-                sc = softmax(outputs.logits[0].detach().cpu().numpy())
-                sentiment_scores.append((s, sc))
-
-            # Find sentence with maximum sentiment change
-            max_change_sentence, max_change_scores = max(
-                sentiment_scores, key=lambda x: abs(x[1][2] - x[1][0])
-            )
-
-            # Determine sentiment of that sentence
-            labels = ["Negative", "Neutral", "Positive"]
-            sentence_sentiment = labels[max_change_scores.argmax()]
-
-            # Proper color mapping
-            color_class1 = {"Positive": "positive", "Negative": "negative", "Neutral": "neutral"}[sentiment]
-            color_class2 = {"Positive": "positive", "Negative": "negative", "Neutral": "neutral"}[sentence_sentiment]
-
-            # Display results
-            st.markdown(f"<p class='{color_class1}'>💬 Overall Sentiment: {sentiment}</p>", unsafe_allow_html=True)
-            st.markdown(f"<p class='{color_class2}'>💡 Most Influential Sentence: “{max_change_sentence}”</p>", unsafe_allow_html=True)
-
-            # Bar chart heading
-            st.markdown("<h3 class='gradient-heading'>📊 Sentiment Probability Distribution</h3>", unsafe_allow_html=True)
-            st.bar_chart(scores)
-
-            # Display raw scores
-            st.write("📊 Sentiment Scores:")
-            st.json(scores)
+        return
+
+    # Proper color mapping
+    color_class1 = {"Positive": "positive", "Negative": "negative", "Neutral": "neutral"}[result["sentiment"]]
+    color_class2 = {"Positive": "positive", "Negative": "negative", "Neutral": "neutral"}[result["sentence_sentiment"]]
+
+    # Display results
+    # live mode rebuilds the document score from the sentence scores: say so
+    overall = "Overall Sentiment (estimated from sentences)" if result["approximate"] else "Overall Sentiment"
+    st.markdown(f"<p class='{color_class1}'>💬 {overall}: {result['sentiment']}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p class='{color_class2}'>💡 Most Influential Sentence: “{result['sentence']}”</p>", unsafe_allow_html=True)
+
+    # Bar chart heading
+    st.markdown("<h3 class='gradient-heading'>📊 Sentiment Probability Distribution</h3>", unsafe_allow_html=True)
+    st.bar_chart(result["scores"])
+
+    # Display raw scores
+    st.write("📊 Sentiment Scores:")
+    st.json(result["scores"])
+
+    st.caption(f"{result['n_new']} sentence(s) scored, {result['n_reused']} reused · "
+               f"score cache hit rate {result['hit_rate']:.0%}")
+
+# -------------------- Live mode (debounced) --------------------
+# The text area hands over its value on Ctrl+Enter / clicking away. Each tick only compares
+# strings; the translator and the model run once per submitted text, after DEBOUNCE_S
+# without a further change, and the stored result is redrawn in between.
+@st.fragment(run_every=0.5)
+def live_analysis():
+    state = st.session_state
+    text = state.get("review", "")
+    if text != state.get("live_seen"):
+        state.live_seen, state.changed_at = text, time.monotonic()
+    if text != state.get("live_text") and time.monotonic() - state.changed_at >= DEBOUNCE_S:
+        # document score rebuilt from sentence scores: an edit costs only the changed sentences
+        state.live_text = text
+        state.live_result = run_analysis(emoji_to_text(text), exact_document=False) if text.strip() else None
+    if state.get("live_result") is not None:
+        show_result(state.live_result)
+
+if live:
+    live_analysis()
+
+# -------------------- Analyze Button -------------------- 
+elif st.button("🔍 Analyze Sentiment"): 
+    with st.spinner("⏳ Analyzing sentiment... please wait 😊"):
+        show_result(run_analysis(user_input, exact_document=True))
 
 
 # -----------------------Footer--------------------------- 
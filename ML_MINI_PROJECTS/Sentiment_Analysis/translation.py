@@ -0,0 +1,215 @@
+"""
+Translation to English in front of the sentiment model.
+
+  - text with clear evidence of being English is passed through (local check, no network)
+  - every translation is memoized in a bounded SQLite cache that survives restarts
+  - translate_many() dedupes, skips English / cached texts and sends the rest to the
+    backend in batches (bulk scoring)
+
+Backends ($SENTIMENT_TRANSLATOR):
+  google : deep_translator.GoogleTranslator (network)
+  none   : local stand-in, returns the text unchanged (offline / air-gapped runs)
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_BACKEND = os.environ.get("SENTIMENT_TRANSLATOR", "google")
+TRANSLATION_CACHE = "translation_cache.db"
+BACKENDS = ("google", "none")
+
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+# frequent English function words plus everyday review vocabulary
+_ENGLISH_WORDS = frozenset("""
+a about after again all also am an and any are as at be because been best bad but buy by can
+could did do does ever excellent for from get good got great had has hate have he her here him
+his how i if in into is it its just like love me money more most much my never nice no not
+nothing now of on one only or our out over price product quality really recommend service
+should so some still than thank thanks that the their them then there these they this time
+to too up us very was waste we well were what when which who why will with work works worst
+would you your
+""".split())
+# the same for the languages most often confused with English in Latin script; a word
+# such as "was" / "in" / "no" counts for both, and English has to come out ahead
+_OTHER_WORDS = {
+    "es": frozenset("""al bien bueno como con de del el en es esta está gracias la las lo los malo me
+                       mi muy no para pero por que se su un una y""".split()),
+    "fr": frozenset("""avec bien c ce cette d de des du elle est et il je l la le les mais mal nous
+                       nul pas pour tres un une vous""".split()),
+    "de": frozenset("""auf das dem den der die du ein eine er es für gut ich ist mit nicht schlecht
+                       sehr sie und was wir zu""".split()),
+    "it": frozenset("""bene che con di e gli il la le lo male molto non per un una""".split()),
+    "pt": frozenset("""as bom com de e mas muito não o os para que ruim um uma""".split()),
+    "nl": frozenset("""de een en goed heel het ik is je met niet op slecht van voor""".split()),
+}
+
+
+# -------------------- Language ID --------------------
+def looks_english(text, min_ratio=0.25):
+    """
+    Cheap local language check that needs positive evidence: Latin-script text where
+    at least min_ratio of the words are common English words, and more of them than
+    the function words of any of Spanish / French / German / Italian / Portuguese /
+    Dutch. Text with no known word at all ('muy bueno', 'sehr schlecht') is translated.
+    """
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return True     # emojis / numbers / punctuation only: nothing to translate
+    if sum(c.isascii() for c in letters) < 0.95 * len(letters):
+        return False
+    words = [w.lower() for w in _WORD.findall(text)]
+    english = sum(w in _ENGLISH_WORDS for w in words)
+    if english == 0 or english < min_ratio * len(words):
+        return False
+    return all(english > sum(w in vocab for w in words) for vocab in _OTHER_WORDS.values())
+
+
+# -------------------- Backends --------------------
+def _google_batch(texts):
+    from deep_translator import GoogleTranslator
+    translator = GoogleTranslator(source="auto", target="en")
+    if len(texts) == 1:
+        return [translator.translate(texts[0])]
+    return translator.translate_batch(texts)
+
+
+_BACKEND_FUNCS = {"google": _google_batch, "none": lambda texts: list(texts)}
+
+
+# -------------------- Persistent cache --------------------
+class TranslationCache:
+    """
+    Bounded SQLite memo (text hash -> translation), least recently used rows evicted.
+    The bound is enforced when the memo is opened and every TRIM_EVERY inserts, so it
+    can be overshot by fewer than TRIM_EVERY rows in between.
+    """
+    TRIM_EVERY = 1000
+
+    def __init__(self, path=TRANSLATION_CACHE, max_entries=100_000):
+        self.max_entries = max_entries
+        self._inserted = 0              # since the last trim
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS translations "
+                           "(key BLOB PRIMARY KEY, translated TEXT NOT NULL, used REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_used ON translations (used)")
+        self._conn.commit()
+        self.trim()
+
+    @staticmethod
+    def key(text, backend):
+        return hashlib.blake2b(f"{backend}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, translated FROM translations WHERE key IN ({','.join('?' * len(part))})", part)
+                found.update(rows.fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE translations SET used = ? WHERE key = ?",
+                                       [(now, k) for k in found])
+                self._conn.commit()
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            rows = [(k, v, now) for k, v in items]
+            self._conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+            self._inserted += len(rows)
+        if self._inserted >= self.TRIM_EVERY:
+            self.trim()
+
+    def trim(self):
+        """Keep at most max_entries rows (least recently used first out)."""
+        with self._lock:
+            self._inserted = 0
+            excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute("DELETE FROM translations WHERE key IN "
+                                   "(SELECT key FROM translations ORDER BY used LIMIT ?)", (excess,))
+                self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -------------------- Translator --------------------
+class Translator:
+    def __init__(self, backend=DEFAULT_BACKEND, cache_path=TRANSLATION_CACHE, max_entries=100_000,
+                 batch_size=50):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown translator {backend!r}; choose one of {BACKENDS}.")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cache = TranslationCache(cache_path, max_entries)
+        self.skipped = self.cache_hits = self.translated = 0
+
+    def translate(self, text):
+        """English text for one input. Raises if the backend fails (e.g. no network)."""
+        return self.translate_many([text], on_error="raise")[0]
+
+    def translate_many(self, texts, on_error="keep"):
+        """
+        English text for every input, in order. Duplicates, English and cached texts
+        never reach the backend. on_error="keep" returns the original text for a
+        batch the backend failed on; "raise" re-raises.
+        """
+        out = list(texts)
+        todo = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip() or self.backend == "none" or looks_english(text):
+                self.skipped += 1
+            else:
+                todo.setdefault(text, []).append(i)
+        if not todo:
+            return out
+
+        keys = {text: TranslationCache.key(text, self.backend) for text in todo}
+        cached = self.cache.get_many(list(keys.values()))
+        missing = []
+        for text, positions in todo.items():
+            hit = cached.get(keys[text])
+            if hit is None:
+                missing.append(text)
+                continue
+            self.cache_hits += len(positions)
+            for i in positions:
+                out[i] = hit
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            try:
+                results = _BACKEND_FUNCS[self.backend](batch)
+            except Exception:
+                if on_error == "raise":
+                    raise
+                continue
+            fresh = []
+            for text, translated in zip(batch, results):
+                if not translated:
+                    continue
+                fresh.append((keys[text], translated))
+                for i in todo[text]:
+                    out[i] = translated
+            self.translated += len(fresh)
+            self.cache.put_many(fresh)
+        return out
+
+    def stats(self):
+        return {"backend": self.backend, "skipped_english": self.skipped, "cache_hits": self.cache_hits,
+                "translated": self.translated, "cache_size": len(self.cache)}
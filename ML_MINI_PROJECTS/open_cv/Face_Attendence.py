@@ -1,185 +1,49 @@
 import streamlit as st
 import cv2
-import numpy as np
-import face_recognition as fr
-import pickle
 import csv
+import io
 import os
+import time
 from datetime import datetime
-import pyttsx3
+from tts import SpeechQueue
+from recognition_cache import RecognitionCache
+from face_engine import (
+    DETECTORS, open_face_db, refresh_face_db, open_attendance_store, warm_up,
+    register_person, recognize_from_image, recognize_faces, stream_attendance,
+    mark_attendance, mark_attendance_bulk,
+)
 
-engine = pyttsx3.init()    # initialize text-to-speech engine
+TTS_BACKEND = os.environ.get("FACE_TTS_BACKEND", "pyttsx3")   # "silent" for headless deployments
 
-def speak(text):
-    engine.say(text)
-    engine.runAndWait()
+@st.cache_resource
+def get_speech_queue():
+    """One background text-to-speech worker per server process."""
+    return SpeechQueue(backend=TTS_BACKEND)
 
-# ------------------ File Names ------------------
-DATA_FILE = "face_data.pkl"        # stores encodings, names, ids
-ATTENDANCE_FILE = "attendance.csv" # stores attendance records (all days)
-TODAY_FILE = "today.csv"           # stores today's attendance only
+def speak(text):
+    """Queue text for speaking and return immediately (see tts.py)."""
+    get_speech_queue().say(text)
 
-# ------------------ Persistence ------------------
-def save_data(known_face_encodings, known_face_names, known_face_ids):
-    with open(DATA_FILE, "wb") as f:
-        pickle.dump((known_face_encodings, known_face_names, known_face_ids), f)
+# ------------------ Shared resources (one per server process) ------------------
+@st.cache_resource
+def get_face_db():
+    """FaceStore + FaceIndex shared by all sessions (the index references the store's mmap)."""
+    warm_up()
+    return open_face_db()
 
 def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "rb") as f:
-            return pickle.load(f)
-    return [], [], []
-
-def ensure_attendance_files():
-    if not os.path.exists(ATTENDANCE_FILE):
-        with open(ATTENDANCE_FILE, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Name", "ID", "Date", "Time"])
-
-    # Reset today.csv daily
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    reset_today = True
-    if os.path.exists(TODAY_FILE):
-        with open(TODAY_FILE, "r") as f:
-            reader = csv.reader(f)
-            header = next(reader, None)
-            first_row = next(reader, None)
-            if first_row and first_row[2] == today_str:
-                reset_today = False
-    if reset_today:
-        with open(TODAY_FILE, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Name", "ID", "Date", "Time"])
-
-
-def load_marked_ids_today():
-    """Load IDs already marked today from today's file."""
-    marked_ids = set()
-    if os.path.exists(TODAY_FILE):
-        with open(TODAY_FILE, "r") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            for row in reader:
-                if len(row) >= 2:
-                    marked_ids.add(row[1])
-    return marked_ids
-def mark_attendance(name, id_no, marked_ids_today):
-    date = datetime.now().strftime("%Y-%m-%d")
-    time_str = datetime.now().strftime("%H:%M:%S")
-
-    if id_no not in marked_ids_today:
-        # Always add to global attendance
-        with open(ATTENDANCE_FILE, "a", newline="") as f:
-            csv.writer(f).writerow([name, id_no, date, time_str])
-
-        # Add to today's attendance
-        with open(TODAY_FILE, "a", newline="") as f:
-            csv.writer(f).writerow([name, id_no, date, time_str])
-
-        marked_ids_today.add(id_no)
-        return True
-    return False
-
-
-# ------------------ Image/encoding utils ------------------
-def bytes_to_bgr(image_bytes: bytes) -> np.ndarray:
-    """Decode raw bytes to OpenCV BGR image."""
-    file_bytes = np.asarray(bytearray(image_bytes), dtype=np.uint8)
-    bgr = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)           #cv2.imdecode() → takes the byte array (still compressed, e.g., JPEG/PNG format) and decodes it into an actual image matrix.
-    return bgr
-
-def get_face_encodings_from_bgr(bgr_image, model="hog"):       # hog is CPU-based, faster, less accurate   and CNN is slower in cpu , and it requires GPU for speed, more accurate
-    """
-    Return list of face encodings from a BGR image.
-    model: "hog" (CPU, fast) or "cnn" (GPU support, slower on CPU)
-    """
-    if bgr_image is None:
-        return []
-    rgb = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
-    locations = fr.face_locations(rgb, model=model)
-    encodings = fr.face_encodings(rgb, locations)
-    return encodings, locations
-
-def register_person(name: str, id_no: str, image_bytes: bytes,
-                    known_encodings, known_names, known_ids, tolerance: float = 0.4):
-    """Add a new person to database if a face is detected; returns (ok, msg)."""
-    if not name or not id_no:
-        return False, "Please enter both Name and ID."
-
-    bgr = bytes_to_bgr(image_bytes)
-    encodings, _ = get_face_encodings_from_bgr(bgr)
-    if len(encodings) == 0:
-        return False, "No face detected in the provided image."
-    if len(encodings) > 1:
-        return False, "Multiple faces detected. Please upload an image with only one face."
-
-    new_encoding = encodings[0]
-
-    # Check duplicate ID
-    if id_no in known_ids:
-        return False, f"ID '{id_no}' already exists."
-
-    # ✅ Check duplicate face (using tolerance)
-    if len(known_encodings) > 0:
-        matches = fr.compare_faces(known_encodings, new_encoding, tolerance=tolerance)
-        if any(matches):
-            existing_index = matches.index(True)
-            existing_name = known_names[existing_index]
-            existing_id = known_ids[existing_index]
-            return False, f"This face already exists in the system with ID  {existing_id}."
-
-    # If no duplicates, save
-    known_encodings.append(new_encoding)
-    known_names.append(name)
-    known_ids.append(id_no)
-    save_data(known_encodings, known_names, known_ids)
-    speak(f"{name} you have Registered successfully")
-    return True, f"Registered {name} ({id_no}) successfully."
-
-# ------------------ Recognition ------------------
-
-def recognize_from_image(image_bytes: bytes, known_encodings, known_names, known_ids, tolerance: float = 0.4):
-    """
-    Recognize first face in image_bytes.
-    Returns (recognized: bool, name, id_no, distance, annotated_image_bgr)
-    If not recognized, name/id_no = 'Unknown'/'N/A'
-    """
-    bgr = bytes_to_bgr(image_bytes)
-    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-    face_locations = fr.face_locations(rgb)
-    face_encodings = fr.face_encodings(rgb, face_locations)
-
-    name, id_no, distance = "Unknown", "N/A", None
-
-    if len(face_encodings) == 0:
-        return None, None, None, None, bgr   # <--- mark as "no face"
-
+    """Return the shared (store, index) after picking up entries appended since the last rerun."""
+    return refresh_face_db(*get_face_db())
 
-    # We'll process the first detected face (you can loop all if needed)
-    face_encoding = face_encodings[0]
-    matches = fr.compare_faces(known_encodings, face_encoding, tolerance=tolerance)
-    face_distances = fr.face_distance(known_encodings, face_encoding) if len(known_encodings) else np.array([])       #distance 0.3 → strong match, distance 0.7 → weak match.
+@st.cache_resource
+def get_attendance_store():
+    """One buffered attendance store per server process (see attendance_store.py)."""
+    return open_attendance_store()
 
-    best_match_index = None
-    if len(face_distances) > 0:
-        best_match_index = int(np.argmin(face_distances))
-
-    recognized = False
-    if best_match_index is not None and matches[best_match_index]:
-        recognized = True
-        name = known_names[best_match_index]
-        id_no = known_ids[best_match_index]
-        distance = float(face_distances[best_match_index])
-
-    # Draw on image
-    if len(face_locations) > 0:
-        (top, right, bottom, left) = face_locations[0]
-        color = (0, 200, 0) if recognized else (0, 0, 255)
-        cv2.rectangle(bgr, (left, top), (right, bottom), color, 2)
-        label = f"{name} ({id_no})" if recognized else "Unknown"
-        cv2.putText(bgr, label, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-
-    return recognized, name, id_no, distance, bgr
+@st.cache_resource
+def get_recognition_cache():
+    """Process-wide cache for repeated / near-identical captures (see recognition_cache.py)."""
+    return RecognitionCache(max_entries=256, ttl=30.0)
 
 # ------------------ Streamlit UI ------------------
 st.set_page_config(page_title="Face Attendance", page_icon="📸", layout="wide")
@@ -357,19 +221,15 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Ensure attendance file exists
-ensure_attendance_files()
+# Shared attendance log (marks are buffered and flushed in the background)
+attendance_store = get_attendance_store()
 
-# Load known data once per session
-if "known_face_encodings" not in st.session_state:
-    kfe, kfn, kfi = load_data()
-    st.session_state.known_face_encodings = kfe
-    st.session_state.known_face_names = kfn
-    st.session_state.known_face_ids = kfi
+# Shared cache for repeated captures
+recognition_cache = get_recognition_cache()
+
+# Shared face database (refreshed incrementally on every rerun)
+face_store, face_index = load_data()
 
-# Load today's marked IDs (persist for session)
-if "marked_ids_today" not in st.session_state:
-    st.session_state.marked_ids_today = load_marked_ids_today()
 
 
 tab1, tab2 = st.tabs(["📝 Register", "✅ Attendance"])
@@ -401,12 +261,12 @@ with tab1:
                 name.strip(),
                 id_no.strip(),
                 img_bytes,
-                st.session_state.known_face_encodings,
-                st.session_state.known_face_names,
-                st.session_state.known_face_ids
+                face_store,
+                face_index
             )
             if ok:
                 st.success(msg)
+                speak(f"{name.strip()} you have Registered successfully")
             else:
                 st.error(msg)
 
@@ -415,32 +275,123 @@ with tab2:
     st.subheader("Mark Attendance")
     st.markdown("Use your camera to capture a frame and we’ll recognize the face.")
     
-    cam_shot = st.camera_input("Capture for attendance")
-    if cam_shot is not None:
-        recognized, name, id_no, distance, annotated_bgr = recognize_from_image(
-            cam_shot.getvalue(),
-            st.session_state.known_face_encodings,
-            st.session_state.known_face_names,
-            st.session_state.known_face_ids,
-            tolerance=0.4
-        )
-
-        # Show annotated image
-        if annotated_bgr is not None:
+    mode = st.radio("Capture mode", ["📷 Snapshot", "🎥 Live stream"], horizontal=True)
+
+    if mode == "🎥 Live stream":
+        source = st.text_input("Video source (camera index, RTSP URL or video file)", value="0")
+        c1, c2 = st.columns(2)
+        detect_every = c1.slider("Run face detection every N frames", 1, 30, 5)
+        scale = c2.slider("Detection scale", 0.25, 1.0, 0.5, 0.05)
+        detector = st.selectbox("Face detector", DETECTORS, index=0)
+        run_stream = st.checkbox("▶️ Start stream")
+        frame_slot = st.empty()
+        status_slot = st.empty()
+        if run_stream:
+            try:
+                for frame, added, stats in stream_attendance(
+                    source, face_index, face_store.names, face_store.ids,
+                    attendance_store, detect_every=detect_every, scale=scale, tolerance=0.4,
+                    detector=detector
+                ):
+                    frame_slot.image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), channels="RGB", use_container_width=True)
+                    for name, id_no in added:
+                        st.toast(f"✅ Attendance marked for {name} ({id_no}).")
+                        speak(f"Welcome {name}. Your attendance has been marked.")
+                    status_slot.caption(f"{stats['fps']:.1f} fps | {stats['tracks']} face(s) tracked | "
+                                        f"{stats['encoded']} encodings in {stats['frames']} frames")
+                st.info("ℹ️ Stream ended.")
+            except ValueError as e:
+                st.error(str(e))
+    else:
+        group_mode = st.checkbox("👥 Group mode (recognize every face in the frame)", value=True)
+        c1, c2 = st.columns(2)
+        detector = c1.selectbox("Face detector", DETECTORS, index=0,
+                                help="haar+hog / dnn+hog: cheap OpenCV detector on the downscaled frame, HOG only on its candidates")
+        scale = c2.slider("Detection scale", 0.25, 1.0, 1.0, 0.05)
+        cam_shot = st.camera_input("Capture for attendance")
+        if cam_shot is not None and group_mode:
+            faces, annotated_bgr, timings = recognize_faces(
+                cam_shot.getvalue(),
+                face_index,
+                face_store.names,
+                face_store.ids,
+                tolerance=0.4,
+                cache=recognition_cache,
+                detector=detector,
+                scale=scale
+            )
             st.image(cv2.cvtColor(annotated_bgr, cv2.COLOR_BGR2RGB), caption="Processed Frame", use_container_width=True)
 
-        if recognized is None:  # ✅ No face detected at all
-            st.warning("⚠️ No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
-            speak("No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
-        elif recognized:
-            added = mark_attendance(name, id_no, st.session_state.marked_ids_today)
-            if added:
-                st.success(f"✅ Attendance marked for {name} ({id_no}).")
-                speak(f"Welcome {name}. Your attendance has been marked.")
+            known = [(f["name"], f["id_no"]) for f in faces if f["recognized"]]
+            t_write = time.perf_counter()
+            added = mark_attendance_bulk(known, attendance_store)
+            timings["write"] = time.perf_counter() - t_write
+
+            if not faces:
+                st.warning("⚠️ No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
+                speak("No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
             else:
-                st.info(f"ℹ️ {name} ({id_no}) is already marked today.")
-            if distance is not None:
-                st.caption(f"Match distance: {distance:.3f}")
-        else:
-            st.warning("👤 Face not recognized. Please register first in the **Register** tab.(and) make sure Your face is clearly visible ")
-            speak("Face not recognized. Please register first in the Register tab.")
+                added_ids = {id_no for _, id_no in added}
+                for f in faces:
+                    if not f["recognized"]:
+                        continue
+                    if f["id_no"] in added_ids:
+                        st.success(f"✅ Attendance marked for {f['name']} ({f['id_no']}).")
+                    else:
+                        st.info(f"ℹ️ {f['name']} ({f['id_no']}) is already marked today.")
+                unknown = len(faces) - len(known)
+                if unknown:
+                    st.warning(f"👤 {unknown} face(s) not recognized. Please register first in the **Register** tab.")
+                if added:
+                    speak("Welcome " + ", ".join(name for name, _ in added) + ". Your attendance has been marked.")
+                elif unknown and not known:
+                    speak("Face not recognized. Please register first in the Register tab.")
+
+            st.caption(f"{len(faces)} face(s) | {detector} @ {scale:.2f}x | " + " | ".join(f"{stage}: {sec * 1000:.1f} ms" for stage, sec in timings.items()))
+        elif cam_shot is not None:
+            recognized, name, id_no, distance, annotated_bgr, detection = recognize_from_image(
+                cam_shot.getvalue(),
+                face_index,
+                face_store.names,
+                face_store.ids,
+                tolerance=0.4,
+                cache=recognition_cache,
+                detector=detector,
+                scale=scale
+            )
+
+            # Show annotated image
+            if annotated_bgr is not None:
+                st.image(cv2.cvtColor(annotated_bgr, cv2.COLOR_BGR2RGB), caption="Processed Frame", use_container_width=True)
+
+            if recognized is None:  # ✅ No face detected at all
+                st.warning("⚠️ No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
+                speak("No face detected.(or) Face is Not visible. Please take a clear photo with your face visible.")
+            elif recognized:
+                added = mark_attendance(name, id_no, attendance_store)
+                if added:
+                    st.success(f"✅ Attendance marked for {name} ({id_no}).")
+                    speak(f"Welcome {name}. Your attendance has been marked.")
+                else:
+                    st.info(f"ℹ️ {name} ({id_no}) is already marked today.")
+                if distance is not None:
+                    st.caption(f"Match distance: {distance:.3f} | {detection['detector']} @ {detection['scale']:.2f}x")
+            else:
+                st.warning("👤 Face not recognized. Please register first in the **Register** tab.(and) make sure Your face is clearly visible ")
+                speak("Face not recognized. Please register first in the Register tab.")
+
+    cache_stats = recognition_cache.stats()
+    st.caption("Recognition cache: " + " | ".join(
+        f"{level} {c['hits']} hits / {c['misses']} misses ({c['hit_rate']:.0%}, {c['size']} entries)"
+        for level, c in cache_stats.items()))
+
+    # ------------------ Today's log ------------------
+    with st.expander("📋 Today's attendance"):
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        rows = attendance_store.records(today_str)
+        st.write(f"{len(rows)} people marked on {today_str}")
+        if rows:
+            st.dataframe([dict(zip(["Name", "ID", "Date", "Time"], r)) for r in rows], use_container_width=True)
+            buf = io.StringIO()
+            csv.writer(buf).writerows([["Name", "ID", "Date", "Time"], *rows])
+            st.download_button("⬇️ Download CSV", buf.getvalue(), file_name=f"attendance_{today_str}.csv", mime="text/csv")
@@ -0,0 +1,163 @@
+import atexit
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    date TEXT NOT NULL,      -- YYYY-MM-DD
+    id   TEXT NOT NULL,
+    name TEXT NOT NULL,
+    time TEXT NOT NULL,      -- HH:MM:SS
+    PRIMARY KEY (date, id)
+) WITHOUT ROWID
+"""
+
+
+class AttendanceStore:
+    """
+    Attendance log in SQLite (WAL mode) with a write-behind buffer.
+
+    mark() only touches memory: the "already marked today" check is a set lookup
+    and the row goes into a buffer that a background thread flushes in one
+    transaction every `flush_interval` seconds (or once `max_buffer` rows are
+    waiting). The (date, id) primary key keeps per-day lookups and date-range
+    reports index-backed however long the history grows.
+    """
+
+    def __init__(self, db_path="attendance.db", flush_interval=2.0, max_buffer=256):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # a flush in progress finishes before the next one starts
+        self._buffer = []
+        self._in_flight = []       # rows taken from the buffer by a flush that has not committed yet
+        self._marked = {}          # date -> set of ids marked that day (loaded lazily)
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # ------------------ Marking ------------------
+    def _marked_on(self, date):
+        ids = self._marked.get(date)
+        if ids is None:
+            with self._db_lock:
+                rows = self._conn.execute("SELECT id FROM attendance WHERE date = ?", (date,)).fetchall()
+            ids = self._marked[date] = {r[0] for r in rows}
+            # marks not written yet count too, or a reloaded day would accept them again
+            ids.update(r[1] for r in self._in_flight + self._buffer if r[0] == date)
+            # keep only today's (and at most one previous) day in memory
+            for old in sorted(self._marked)[:-2]:
+                del self._marked[old]
+        return ids
+
+    def mark_many(self, people, when=None):
+        """
+        Mark (name, id_no) pairs for the day of `when` (default: now).
+        Returns the pairs that were newly marked.
+        """
+        when = when or datetime.now()
+        date, time_str = when.strftime("%Y-%m-%d"), when.strftime("%H:%M:%S")
+        added = []
+        with self._lock:
+            marked = self._marked_on(date)
+            for name, id_no in people:
+                if id_no not in marked:
+                    marked.add(id_no)
+                    self._buffer.append((date, id_no, name, time_str))
+                    added.append((name, id_no))
+            if len(self._buffer) >= self.max_buffer:
+                self._wake.set()
+        return added
+
+    def mark(self, name, id_no, when=None):
+        """Mark one person; True if newly marked, False if already marked that day."""
+        return bool(self.mark_many([(name, id_no)], when))
+
+    def is_marked(self, id_no, date=None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            return id_no in self._marked_on(date)
+
+    def marked_ids(self, date=None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            return set(self._marked_on(date))
+
+    # ------------------ Persistence ------------------
+    def flush(self):
+        """Write all buffered marks in a single transaction."""
+        with self._flush_lock:
+            with self._lock:
+                rows = self._in_flight = self._buffer
+                self._buffer = []
+            if rows:
+                try:
+                    with self._db_lock, self._conn:
+                        self._conn.executemany("INSERT OR IGNORE INTO attendance VALUES (?, ?, ?, ?)", rows)
+                finally:
+                    with self._lock:
+                        self._in_flight = []
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Flush what is left and release the database."""
+        if not self._closed:
+            self._closed = True
+            self._wake.set()
+            self._flusher.join()
+            self.flush()
+            self._conn.close()
+
+    # ------------------ Reports ------------------
+    def records(self, start_date, end_date=None):
+        """Rows (name, id, date, time) with start_date <= date <= end_date, in time order."""
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT name, id, date, time FROM attendance WHERE date BETWEEN ? AND ? ORDER BY date, time",
+                (start_date, end_date or start_date)).fetchall()
+
+    def export_csv(self, path, start_date, end_date=None):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "ID", "Date", "Time"])
+            writer.writerows(self.records(start_date, end_date))
+
+    def import_csv(self, path):
+        """One-off import of a legacy Name,ID,Date,Time CSV log."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = [(r[2], r[1], r[0], r[3]) for r in reader if len(r) >= 4]
+        with self._db_lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO attendance VALUES (?, ?, ?, ?)", rows)
+            imported = self._conn.total_changes - before
+        with self._lock:
+            self._marked.clear()
+        return imported
+
+    def is_empty(self):
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute("SELECT 1 FROM attendance LIMIT 1").fetchone() is None
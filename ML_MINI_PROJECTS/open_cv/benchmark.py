@@ -0,0 +1,244 @@
+"""
+Headless benchmark for the face attendance hot path (no Streamlit).
+
+Stages measured:
+  decode : face_engine.bytes_to_bgr + BGR->RGB
+  detect : face_detection.detect_faces with the chosen detector / scale
+  encode : fr.face_encodings
+  match  : FaceIndex.match against synthetic rosters (default 1k .. 100k encodings;
+           1M is opt-in via --sizes and needs ~1.5-2 GB of RAM)
+  write  : AttendanceStore.mark_many + flush
+  cold   : (--cold-start) fresh interpreter importing face_engine, with and without warm_up()
+
+Every run writes one JSON report (p50/p95/p99 per stage in ms, the peak RSS of the
+whole benchmark process - not per stage -, versions, git commit) with a fixed seed and schema, so reports from different commits can be
+compared with --compare.
+
+Usage:
+    python benchmark.py --frames samples/ --sizes 1000,10000,100000 --out bench.json
+    python benchmark.py --sizes 1000,1000000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from attendance_store import AttendanceStore
+from face_index import FaceIndex
+
+SCHEMA_VERSION = 2
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+# ------------------ Helpers ------------------
+def summarize(samples_s):
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    if len(ms) == 0:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"n": len(ms), "mean_ms": float(ms.mean()), "p50_ms": float(p50),
+            "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+def peak_rss_mb():
+    """High-water mark of this process's RSS (covers every stage run so far)."""
+    try:
+        import resource
+    except ImportError:      # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def synthetic_encodings(n, rng, dim=128):
+    """Random encodings with roughly the per-dimension spread of dlib encodings."""
+    return (rng.standard_normal((n, dim), dtype=np.float32) * 0.09).astype(np.float32)
+
+
+# ------------------ Stages ------------------
+def bench_frames(frames_dir, detector, scale, repeat):
+    """decode / detect / encode per sample frame; returns (stage summaries, probe encodings)."""
+    from face_engine import bytes_to_bgr, cv2, fr, detect_faces
+
+    files = sorted(f for f in os.listdir(frames_dir) if f.lower().endswith(IMAGE_EXTS))
+    times = {"decode": [], "detect": [], "encode": []}
+    per_size = {}
+    probes = []
+    skipped = []
+    for f in files:
+        with open(os.path.join(frames_dir, f), "rb") as fh:
+            data = fh.read()
+        if bytes_to_bgr(data) is None:      # unreadable / not really an image
+            print(f"SKIP  {f}: could not read image", file=sys.stderr)
+            skipped.append(f)
+            continue
+        for r in range(repeat):
+            t0 = time.perf_counter()
+            bgr = bytes_to_bgr(data)
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            t1 = time.perf_counter()
+            locations, _ = detect_faces(rgb, detector=detector, scale=scale)
+            t2 = time.perf_counter()
+            encodings = fr.face_encodings(rgb, locations)
+            t3 = time.perf_counter()
+            times["decode"].append(t1 - t0)
+            times["detect"].append(t2 - t1)
+            times["encode"].append(t3 - t2)
+            size = f"{bgr.shape[1]}x{bgr.shape[0]}"
+            per_size.setdefault(size, []).append(t3 - t0)
+            if r == 0:
+                probes.extend(encodings)
+
+    stages = {stage: summarize(v) for stage, v in times.items()}
+    stages["frame_total_by_size"] = {size: summarize(v) for size, v in per_size.items()}
+    stages["frames"] = len(files) - len(skipped)
+    stages["skipped_frames"] = skipped
+    return stages, np.asarray(probes, dtype=np.float32).reshape(-1, 128)
+
+
+def bench_match(sizes, probes, rng, queries, batch, nlist):
+    results = {}
+    for n in sizes:
+        db = synthetic_encodings(n, rng)
+        t0 = time.perf_counter()
+        index = FaceIndex(db, nlist=nlist)
+        build_s = time.perf_counter() - t0
+        del db
+
+        samples = []
+        for q in range(queries):
+            if len(probes):
+                probe = probes[np.arange(q * batch, (q + 1) * batch) % len(probes)]
+            else:
+                probe = synthetic_encodings(batch, rng)
+            t0 = time.perf_counter()
+            index.match(probe, tolerance=0.4)
+            samples.append(time.perf_counter() - t0)
+        results[str(n)] = {"build_s": build_s, "query": summarize(samples)}
+        del index
+    return results
+
+
+def bench_write(marks, batch):
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, "bench.db"), flush_interval=3600)
+        for start in range(0, marks, batch):
+            people = [(f"Person {i}", f"ID{i:07d}") for i in range(start, min(start + batch, marks))]
+            t0 = time.perf_counter()
+            store.mark_many(people)
+            samples.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        store.flush()
+        flush_s = time.perf_counter() - t0
+        store.close()
+    return {"mark": summarize(samples), "flush_s": flush_s, "marks": marks}
+
+
+def bench_cold_start(runs):
+    """Wall time of fresh interpreters: bare, importing face_engine, importing + warm_up()."""
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def timed(code):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=here, check=True, capture_output=True)
+        return time.perf_counter() - t0
+
+    return {"python": summarize([timed("pass") for _ in range(runs)]),
+            "import_engine": summarize([timed("import face_engine") for _ in range(runs)]),
+            "import_warm_up": summarize([timed("import face_engine; face_engine.warm_up()") for _ in range(runs)])}
+
+
+# ------------------ Reporting ------------------
+def compare(current, previous):
+    """Print p50/p95 deltas for every stage present in both reports."""
+    def flat(report, prefix=""):
+        out = {}
+        for key, value in report.items():
+            if isinstance(value, dict) and "p50_ms" in value:
+                out[prefix + key] = value
+            elif isinstance(value, dict):
+                out.update(flat(value, f"{prefix}{key}."))
+        return out
+
+    cur, prev = flat(current["results"]), flat(previous["results"])
+    print(f"\nvs {previous.get('commit')} ({previous.get('timestamp')})")
+    for key in sorted(cur.keys() & prev.keys()):
+        for p in ("p50_ms", "p95_ms"):
+            a, b = prev[key][p], cur[key][p]
+            change = (b - a) / a * 100 if a else 0.0
+            flag = "  <-- regression" if change > 10 else ""
+            print(f"  {key:<40} {p}: {a:9.3f} -> {b:9.3f} ms ({change:+6.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the face attendance hot path.")
+    parser.add_argument("--frames", help="directory of sample frames (enables decode/detect/encode stages)")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="synthetic roster sizes (1000000 works but peaks around 1.5-2 GB)")
+    parser.add_argument("--detector", default="hog", help="face detector for the detect stage")
+    parser.add_argument("--scale", type=float, default=1.0, help="detection scale")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the sample frames")
+    parser.add_argument("--queries", type=int, default=200, help="match queries per roster size")
+    parser.add_argument("--batch", type=int, default=1, help="probe encodings per match query")
+    parser.add_argument("--nlist", type=int, default=0, help="FaceIndex IVF partitions (0 = exact)")
+    parser.add_argument("--marks", type=int, default=10000, help="attendance marks for the write stage")
+    parser.add_argument("--cold-start", type=int, default=0, metavar="RUNS",
+                        help="also time RUNS fresh interpreter start-ups (import / warm_up)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = {}
+    probes = np.empty((0, 128), dtype=np.float32)
+    if args.frames:
+        results["frames"], probes = bench_frames(args.frames, args.detector, args.scale, args.repeat)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results["match"] = bench_match(sizes, probes, rng, args.queries, args.batch, args.nlist)
+    results["write"] = bench_write(args.marks, batch=max(args.batch, 1))
+    if args.cold_start:
+        results["cold"] = bench_cold_start(args.cold_start)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "args": vars(args),
+        "process_peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        print(f"Report written to {args.out}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Bulk enrollment for the face attendance system.
+
+Encodes a whole batch of employee photos across a process pool, rejects
+duplicate IDs / faces (against the existing database and within the batch)
+and commits everything to the FaceStore with a single write.
+
+Safe to run next to the app: the duplicate checks against the store and the
+append happen under FaceStore.writer_lock() (an exclusive lock shared by every
+process, see face_store.py), so nothing registered meanwhile is missed or
+overwritten. Only the encoding runs outside the lock.
+
+Accepted inputs:
+  - a CSV manifest with columns name,id,image (image paths relative to the CSV)
+  - a folder or ZIP containing such a manifest.csv, or images named <ID>_<Name>.jpg
+
+Usage:
+    python bulk_register.py new_hires.zip --workers 8
+"""
+import argparse
+import csv
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from face_engine import DATA_DIR, LEGACY_DATA_FILE, bytes_to_bgr, cv2, fr, open_face_db
+from face_index import FaceIndex
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+MANIFEST_NAME = "manifest.csv"
+
+
+# ------------------ Collecting jobs ------------------
+def _parse_filename(path):
+    """'E042_Jane_Doe.jpg' -> ('Jane Doe', 'E042')"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    id_no, _, name = stem.partition("_")
+    return name.replace("_", " ").strip(), id_no.strip()
+
+
+def _read_manifest(text):
+    return [(row["name"].strip(), row["id"].strip(), row["image"].strip())
+            for row in csv.DictReader(io.StringIO(text))]
+
+
+def collect_jobs(source):
+    """Return a list of (name, id_no, image) where image is a file path or raw bytes."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            members = {os.path.normpath(n): n for n in zf.namelist() if not n.endswith("/")}
+            manifest = next((n for n in members if os.path.basename(n) == MANIFEST_NAME), None)
+            if manifest:
+                base = os.path.dirname(manifest)
+                return [(name, id_no, zf.read(members[os.path.normpath(os.path.join(base, img))]))
+                        for name, id_no, img in _read_manifest(zf.read(members[manifest]).decode("utf-8"))]
+            return [(*_parse_filename(n), zf.read(real)) for n, real in sorted(members.items())
+                    if n.lower().endswith(IMAGE_EXTS)]
+
+    if os.path.isdir(source):
+        manifest = os.path.join(source, MANIFEST_NAME)
+        if not os.path.exists(manifest):
+            return [(*_parse_filename(f), os.path.join(source, f)) for f in sorted(os.listdir(source))
+                    if f.lower().endswith(IMAGE_EXTS)]
+        source = manifest
+
+    base = os.path.dirname(source)
+    with open(source, newline="", encoding="utf-8") as f:
+        return [(name, id_no, os.path.join(base, img)) for name, id_no, img in _read_manifest(f.read())]
+
+
+# ------------------ Encoding (runs in worker processes) ------------------
+def encode_job(job):
+    """Return (name, id_no, encoding or None, error message or None)."""
+    name, id_no, image = job
+    if isinstance(image, bytes):
+        bgr = bytes_to_bgr(image)
+    else:
+        bgr = cv2.imread(image, cv2.IMREAD_COLOR)
+    if bgr is None:
+        return name, id_no, None, "could not read image"
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    locations = fr.face_locations(rgb)
+    if len(locations) != 1:
+        return name, id_no, None, "no face detected" if not locations else "multiple faces detected"
+    return name, id_no, fr.face_encodings(rgb, locations)[0].astype(np.float32), None
+
+
+# ------------------ Enrollment ------------------
+def _earlier_neighbours(batch, tolerance, block=1024):
+    """
+    For each row i of batch, every row j < i within tolerance (nearest first).
+    Distances are computed a block of rows at a time, so memory stays block x N.
+    """
+    sq_norms = np.einsum("ij,ij->i", batch, batch)
+    limit = tolerance ** 2
+    for start in range(0, len(batch), block):
+        end = min(start + block, len(batch))
+        d2 = sq_norms[None, :end] - 2.0 * (batch[start:end] @ batch[:end].T) + sq_norms[start:end, None]
+        for i, row in zip(range(start, end), d2):
+            near = np.flatnonzero(row[:i] <= limit)
+            yield near[np.argsort(row[near], kind="stable")]
+
+
+def bulk_register(jobs, store, workers=None, tolerance=0.4, dry_run=False):
+    """
+    Encode, de-duplicate and commit a batch of (name, id_no, image) jobs.
+    Returns (accepted [(name, id_no)], rejected [(name, id_no, reason)], stats dict).
+    """
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(encode_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    t_encode = time.perf_counter() - t0
+
+    rejected = [(name, id_no, err) for name, id_no, enc, err in results if err]
+    ok = [(name, id_no, enc) for name, id_no, enc, err in results if not err]
+
+    accepted = []
+    with store.writer_lock():
+        store.refresh()
+        candidates = []
+        seen_ids = set()
+        for name, id_no, enc in ok:
+            if not name or not id_no:
+                rejected.append((name, id_no, "missing name or ID"))
+            elif id_no in store.row_of_id or id_no in seen_ids:
+                rejected.append((name, id_no, f"ID '{id_no}' already exists"))
+            else:
+                seen_ids.add(id_no)
+                candidates.append((name, id_no, enc))
+
+        if candidates:
+            batch = np.stack([enc for _, _, enc in candidates])
+
+            # duplicates of people already registered: one matrix query for the whole batch
+            existing = FaceIndex()
+            existing.sync(store.encodings)
+            existing_idx, _ = existing.match(batch, tolerance=tolerance)
+
+            # duplicates inside the batch: the first occurrence of a face wins
+            keep = np.zeros(len(batch), dtype=bool)
+            for i, earlier in enumerate(_earlier_neighbours(batch, tolerance)):
+                name, id_no, _ = candidates[i]
+                if existing_idx[i] >= 0:
+                    rejected.append((name, id_no, f"face already registered with ID {store.ids[existing_idx[i]]}"))
+                    continue
+                earlier = earlier[keep[earlier]]
+                if len(earlier):
+                    rejected.append((name, id_no, f"same face as ID {candidates[earlier[0]][1]} in this batch"))
+                    continue
+                keep[i] = True
+                accepted.append((name, id_no))
+
+            if accepted and not dry_run:
+                store.append(batch[keep], [n for n, _ in accepted], [i for _, i in accepted])
+
+    elapsed = time.perf_counter() - t0
+    stats = {"images": len(jobs), "accepted": len(accepted), "rejected": len(rejected),
+             "encode_s": t_encode, "total_s": elapsed,
+             "images_per_s": len(jobs) / elapsed if elapsed else 0.0}
+    return accepted, rejected, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-register faces from a folder, ZIP or CSV manifest.")
+    parser.add_argument("source", help="folder, .zip or manifest .csv (columns: name,id,image)")
+    parser.add_argument("--db", default=DATA_DIR, help=f"FaceStore directory (default: {DATA_DIR})")
+    parser.add_argument("--workers", type=int, default=None, help="encoding processes (default: CPU count)")
+    parser.add_argument("--tolerance", type=float, default=0.4, help="duplicate-face distance threshold")
+    parser.add_argument("--dry-run", action="store_true", help="check everything but do not write")
+    args = parser.parse_args()
+
+    jobs = collect_jobs(args.source)
+    store, _ = open_face_db(args.db, LEGACY_DATA_FILE)     # imports a legacy face_data.pkl first
+    accepted, rejected, stats = bulk_register(jobs, store, args.workers, args.tolerance, args.dry_run)
+
+    for name, id_no, reason in rejected:
+        print(f"SKIP  {id_no:<12} {name:<30} {reason}")
+    print(f"\nRegistered {stats['accepted']} / {stats['images']} images "
+          f"({stats['rejected']} skipped){' [dry run]' if args.dry_run else ''}")
+    print(f"Encoding: {stats['encode_s']:.2f}s | Total: {stats['total_s']:.2f}s | "
+          f"Throughput: {stats['images_per_s']:.1f} images/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import time
+
+from lazy_import import lazy_module
+
+cv2 = lazy_module("cv2")
+fr = lazy_module("face_recognition")
+
+# ------------------ Detectors ------------------
+# "hog" / "cnn"          : face_recognition (dlib) on the (optionally downscaled) frame
+# "haar" / "dnn"         : OpenCV only; cheap, boxes are a little looser than dlib's
+# "haar+hog" / "dnn+hog" : cascade - the cheap detector proposes regions on the downscaled
+#                          frame, HOG then confirms / tightens the box inside each region
+DETECTORS = ("hog", "cnn", "haar", "dnn", "haar+hog", "dnn+hog")
+
+HAAR_FILE = "haarcascade_frontalface_default.xml"   # looked up in cv2.data.haarcascades
+# OpenCV's res10 SSD face model (not shipped with opencv-python; download into models/)
+DNN_PROTO = os.environ.get("FACE_DNN_PROTO", "models/deploy.prototxt")
+DNN_WEIGHTS = os.environ.get("FACE_DNN_WEIGHTS", "models/res10_300x300_ssd_iter_140000.caffemodel")
+DNN_CONFIDENCE = 0.5
+REGION_MARGIN = 0.25      # grow cheap-detector boxes by this much before running HOG on them
+
+_models = {}
+
+
+def _haar():
+    if "haar" not in _models:
+        _models["haar"] = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, HAAR_FILE))
+    return _models["haar"]
+
+
+def _dnn():
+    if "dnn" not in _models:
+        if not (os.path.exists(DNN_PROTO) and os.path.exists(DNN_WEIGHTS)):
+            raise ValueError(f"DNN face model not found ({DNN_PROTO}, {DNN_WEIGHTS}).")
+        _models["dnn"] = cv2.dnn.readNetFromCaffe(DNN_PROTO, DNN_WEIGHTS)
+    return _models["dnn"]
+
+
+def _cheap_boxes(rgb_small, detector):
+    """(top, right, bottom, left) boxes from the OpenCV detectors."""
+    if detector == "haar":
+        gray = cv2.cvtColor(rgb_small, cv2.COLOR_RGB2GRAY)
+        found = _haar().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in found]
+
+    h, w = rgb_small.shape[:2]
+    blob = cv2.dnn.blobFromImage(cv2.cvtColor(rgb_small, cv2.COLOR_RGB2BGR), 1.0, (300, 300), (104.0, 177.0, 123.0))
+    net = _dnn()
+    net.setInput(blob)
+    out = net.forward()[0, 0]
+    boxes = []
+    for _, _, conf, x1, y1, x2, y2 in out:
+        if conf >= DNN_CONFIDENCE:
+            boxes.append((int(max(0, y1) * h), int(min(1, x2) * w), int(min(1, y2) * h), int(max(0, x1) * w)))
+    return boxes
+
+
+def _rescale(boxes, scale, shape):
+    h, w = shape[:2]
+    return [(min(int(t / scale), h), min(int(r / scale), w), min(int(b / scale), h), max(int(l / scale), 0))
+            for (t, r, b, l) in boxes]
+
+
+def detect_faces(rgb, detector="hog", scale=1.0):
+    """
+    Face boxes (top, right, bottom, left) in full-resolution coordinates.
+    Returns (locations, info) where info records what ran:
+      {"detector", "scale", "candidates" (cascade regions), "detect_s"}
+    """
+    if detector not in DETECTORS:
+        raise ValueError(f"Unknown detector {detector!r}; choose one of {DETECTORS}.")
+    if not scale > 0:
+        raise ValueError(f"Detection scale must be > 0, got {scale!r}.")
+    t0 = time.perf_counter()
+    small = rgb if scale >= 1.0 else cv2.resize(rgb, (0, 0), fx=scale, fy=scale)
+    scale = min(scale, 1.0)
+    candidates = None
+
+    if detector in ("hog", "cnn"):
+        locations = _rescale(fr.face_locations(small, model=detector), scale, rgb.shape)
+    elif detector in ("haar", "dnn"):
+        locations = _rescale(_cheap_boxes(small, detector), scale, rgb.shape)
+    else:
+        regions = _rescale(_cheap_boxes(small, detector.split("+")[0]), scale, rgb.shape)
+        candidates = len(regions)
+        h, w = rgb.shape[:2]
+        locations = []
+        for (t, r, b, l) in regions:
+            mh, mw = int((b - t) * REGION_MARGIN), int((r - l) * REGION_MARGIN)
+            top, left = max(t - mh, 0), max(l - mw, 0)
+            crop = rgb[top:min(b + mh, h), left:min(r + mw, w)]
+            for (ct, cr, cb, cl) in fr.face_locations(crop, model="hog"):
+                box = (ct + top, cr + left, cb + top, cl + left)
+                if all(_overlap(box, other) < 0.5 for other in locations):
+                    locations.append(box)
+
+    info = {"detector": detector, "scale": scale, "candidates": candidates, "detect_s": time.perf_counter() - t0}
+    return locations, info
+
+
+def _overlap(a, b):
+    """Intersection over the smaller box (regions from the cheap detector can overlap)."""
+    inter = max(0, min(a[2], b[2]) - max(a[0], b[0])) * max(0, min(a[1], b[1]) - max(a[3], b[3]))
+    smaller = min((a[2] - a[0]) * (a[1] - a[3]), (b[2] - b[0]) * (b[1] - b[3]))
+    return inter / smaller if smaller > 0 else 0.0
@@ -0,0 +1,369 @@
+"""
+Recognition / persistence core of the face attendance system.
+
+Importing this module is cheap: OpenCV and face_recognition (dlib) are only
+loaded on first use, or explicitly with warm_up(). Face_Attendence.py is the
+Streamlit UI on top; workers, batch jobs and benchmarks import this directly.
+"""
+import os
+import pickle
+import time
+
+import numpy as np
+
+from attendance_store import AttendanceStore
+from face_detection import DETECTORS, detect_faces
+from face_index import FaceIndex
+from face_store import FaceStore
+from face_tracker import FaceTracker
+from lazy_import import lazy_module
+
+cv2 = lazy_module("cv2")
+fr = lazy_module("face_recognition")
+
+# ------------------ File Names ------------------
+DATA_DIR = "face_db"               # stores encodings (mmap) + ids/names, see face_store.py
+LEGACY_DATA_FILE = "face_data.pkl" # old pickle format, imported once into DATA_DIR
+ATTENDANCE_DB = "attendance.db"   # attendance records, SQLite (WAL) indexed by (date, id)
+ATTENDANCE_FILE = "attendance.csv" # old CSV log, imported once into ATTENDANCE_DB
+
+# ------------------ Persistence ------------------
+def open_face_db(data_dir=DATA_DIR, legacy_file=LEGACY_DATA_FILE):
+    """
+    Open the FaceStore and an (empty) FaceIndex to go with it; call refresh_face_db to fill it.
+    The index references the store's read-only mmap, so it can be shared without copies.
+    Every writer (the app, bulk_register.py) opens the store through here, so a legacy
+    face_data.pkl is imported before anything else is added.
+    """
+    store = FaceStore(data_dir)
+    if len(store) == 0 and os.path.exists(legacy_file):
+        with store.writer_lock():
+            store.refresh()     # another process may have imported (or registered) meanwhile
+            if len(store) == 0:
+                with open(legacy_file, "rb") as f:
+                    kfe, kfn, kfi = pickle.load(f)
+                if len(kfe):
+                    store.append(kfe, kfn, kfi)
+    return store, FaceIndex()
+
+def refresh_face_db(store, face_index):
+    """Pick up entries appended (by any process) since the last refresh."""
+    store.refresh()
+    face_index.sync(store.encodings)
+    return store, face_index
+
+def open_attendance_store(db_path=ATTENDANCE_DB, legacy_csv=ATTENDANCE_FILE):
+    """Buffered attendance store (see attendance_store.py), importing the old CSV log once."""
+    store = AttendanceStore(db_path)
+    if store.is_empty():
+        store.import_csv(legacy_csv)
+    return store
+
+def mark_attendance(name, id_no, attendance_store):
+    """Returns True if newly marked, False if this ID is already marked today."""
+    return attendance_store.mark(name, id_no)
+
+def mark_attendance_bulk(people, attendance_store):
+    """
+    Mark attendance for many (name, id_no) pairs at once.
+    Returns the list of (name, id_no) that were newly marked.
+    """
+    return attendance_store.mark_many(people)
+
+
+# ------------------ Image/encoding utils ------------------
+def bytes_to_bgr(image_bytes: bytes) -> np.ndarray:
+    """Decode raw bytes to OpenCV BGR image."""
+    file_bytes = np.asarray(bytearray(image_bytes), dtype=np.uint8)
+    bgr = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)           #cv2.imdecode() → takes the byte array (still compressed, e.g., JPEG/PNG format) and decodes it into an actual image matrix.
+    return bgr
+
+def get_face_encodings_from_bgr(bgr_image, model="hog", locations=None, scale=1.0):       # hog is CPU-based, faster, less accurate   and CNN is slower in cpu , and it requires GPU for speed, more accurate
+    """
+    Return (encodings, locations) for the faces in a BGR image.
+    model: face detector, "hog" (CPU, fast) or "cnn" (GPU support, slower on CPU),
+           or any cascade from face_detection.DETECTORS (e.g. "haar+hog")
+    locations: already known face boxes (e.g. from a tracker); skips detection when given
+    scale: detect on a downscaled copy (< 1.0 is faster); boxes are mapped back before encoding
+    """
+    if bgr_image is None:
+        return [], []
+    rgb = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
+    if locations is None:
+        locations = detect_face_locations(rgb, model=model, scale=scale, is_rgb=True)
+    encodings = fr.face_encodings(rgb, locations)
+    return encodings, locations
+
+def detect_face_locations(image, model="hog", scale=1.0, is_rgb=False):
+    """Face boxes (top, right, bottom, left) in full-resolution coordinates (see face_detection.py)."""
+    rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    locations, _ = detect_faces(rgb, detector=model, scale=scale)
+    return locations
+
+def register_person(name: str, id_no: str, image_bytes: bytes,
+                    face_store, face_index, tolerance: float = 0.4):
+    """Add a new person to database if a face is detected; returns (ok, msg).
+    face_index is the FaceIndex kept in sync with face_store (row i <-> face_store.ids[i])."""
+    if not name or not id_no:
+        return False, "Please enter both Name and ID."
+
+    bgr = bytes_to_bgr(image_bytes)
+    encodings, _ = get_face_encodings_from_bgr(bgr)
+    if len(encodings) == 0:
+        return False, "No face detected in the provided image."
+    if len(encodings) > 1:
+        return False, "Multiple faces detected. Please upload an image with only one face."
+
+    new_encoding = encodings[0]
+
+    # checks + append under the store's cross-process lock, so a concurrent writer
+    # (another session, bulk_register.py) cannot slip the same ID / face in between
+    with face_store.writer_lock():
+        refresh_face_db(face_store, face_index)
+
+        # Check duplicate ID
+        if id_no in face_store.row_of_id:
+            return False, f"ID '{id_no}' already exists."
+
+        # ✅ Check duplicate face (using tolerance)
+        if len(face_index) > 0:
+            existing_index, _ = face_index.match(new_encoding, tolerance=tolerance)
+            if existing_index[0] >= 0:
+                existing_id = face_store.ids[existing_index[0]]
+                return False, f"This face already exists in the system with ID  {existing_id}."
+
+        # If no duplicates, save (appends one row, no full rewrite)
+        face_store.append(new_encoding, [name], [id_no])
+        face_index.sync(face_store.encodings)
+    return True, f"Registered {name} ({id_no}) successfully."
+
+# ------------------ Recognition ------------------
+def match_encodings(face_index, face_encodings, tolerance, cache=None):
+    """
+    Best index match per encoding (-1 = unknown) and its distance.
+    With a cache, only encodings not seen recently go through the index (in one batch).
+    """
+    encodings = np.asarray(face_encodings, dtype=np.float32).reshape(-1, face_index.dim)
+    if cache is None:
+        return face_index.match(encodings, tolerance=tolerance)
+
+    cached = [cache.get_match(enc, len(face_index), tolerance) for enc in encodings]
+    best_indices = np.array([c[0] if c else -1 for c in cached], dtype=np.int64)
+    best_distances = np.array([c[1] if c else np.inf for c in cached], dtype=np.float32)
+    missing = [i for i, c in enumerate(cached) if c is None]
+    if missing:
+        idx, dist = face_index.match(encodings[missing], tolerance=tolerance)
+        best_indices[missing], best_distances[missing] = idx, dist
+        for i in missing:
+            cache.put_match(encodings[i], len(face_index), tolerance, best_indices[i], best_distances[i])
+    return best_indices, best_distances
+
+def recognize_from_image(image_bytes: bytes, face_index, known_names, known_ids, tolerance: float = 0.4, cache=None,
+                         detector: str = "hog", scale: float = 1.0):
+    """
+    Recognize first face in image_bytes.
+    Returns (recognized: bool, name, id_no, distance, annotated_image_bgr, detection)
+    If not recognized, name/id_no = 'Unknown'/'N/A'
+    detection: {"detector", "scale"} that produced the result (recorded for benchmarking)
+    cache: optional RecognitionCache; identical image bytes return the cached result, a
+           near-identical frame skips detection + encoding, and the match goes through
+           the encoding-level cache (see match_encodings).
+    detector / scale: face detector (face_detection.DETECTORS) and the resolution it runs at.
+    """
+    params = ("first", tolerance, detector, scale)
+    if cache is not None:
+        key = cache.frame_key(image_bytes, len(face_index), *params)
+        hit = cache.frames.get(key)
+        if hit is not None:
+            return (*hit[:4], hit[4].copy(), dict(hit[5]))
+
+    bgr = bytes_to_bgr(image_bytes)
+    if cache is not None:
+        signature = cache.frame_signature(bgr)
+        similar = cache.get_similar(signature, len(face_index), *params)
+        if similar is not None:
+            recognized, name, id_no, distance, location, detection = similar
+            if location is not None:
+                draw_face_box(bgr, location, recognized, name, id_no)
+            cache.frames.put(key, (*similar[:4], bgr.copy(), detection))
+            return recognized, name, id_no, distance, bgr, dict(detection)
+
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    face_locations, info = detect_faces(rgb, detector=detector, scale=scale)
+    face_encodings = fr.face_encodings(rgb, face_locations)
+    detection = {"detector": info["detector"], "scale": info["scale"]}
+
+    name, id_no, distance, location = "Unknown", "N/A", None, None
+
+    if len(face_encodings) == 0:
+        recognized, name, id_no = None, None, None   # <--- mark as "no face"
+    else:
+        # We'll process the first detected face (you can loop all if needed)
+        # One matrix product against the whole index instead of compare_faces + face_distance scans
+        best_indices, best_distances = match_encodings(face_index, face_encodings[:1], tolerance, cache)       #distance 0.3 → strong match, distance 0.7 → weak match.
+        best_match_index = int(best_indices[0])
+
+        recognized = False
+        if best_match_index >= 0:
+            recognized = True
+            name = known_names[best_match_index]
+            id_no = known_ids[best_match_index]
+            distance = float(best_distances[0])
+
+        # Draw on image
+        location = face_locations[0]
+        draw_face_box(bgr, location, recognized, name, id_no)
+
+    if cache is not None:
+        cache.frames.put(key, (recognized, name, id_no, distance, bgr.copy(), detection))
+        cache.put_similar(signature, len(face_index), params, (recognized, name, id_no, distance, location, detection))
+    return recognized, name, id_no, distance, bgr, dict(detection)
+
+def draw_face_box(bgr, location, recognized, name, id_no):
+    """Draw a green (known) or red (unknown) labelled box in place."""
+    (top, right, bottom, left) = location
+    color = (0, 200, 0) if recognized else (0, 0, 255)
+    cv2.rectangle(bgr, (left, top), (right, bottom), color, 2)
+    label = f"{name} ({id_no})" if recognized else "Unknown"
+    cv2.putText(bgr, label, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+def recognize_faces(image_bytes: bytes, face_index, known_names, known_ids, tolerance: float = 0.4, cache=None,
+                    detector: str = "hog", scale: float = 1.0):
+    """
+    Recognize every face in image_bytes with one vectorized match against the index.
+    Returns (faces, annotated_image_bgr, timings)
+      faces   : list of dicts {recognized, name, id_no, distance, location, detector, scale},
+                one per detected face
+      timings : seconds spent per stage ("decode", "detect", "encode", "match"),
+                or {"cache": ...} / {"similar_cache": ...} when the frame (or a
+                near-identical one) was served from the cache
+    detector / scale: face detector (face_detection.DETECTORS) and the resolution it runs at.
+    """
+    t0 = time.perf_counter()
+    params = ("all", tolerance, detector, scale)
+    if cache is not None:
+        key = cache.frame_key(image_bytes, len(face_index), *params)
+        hit = cache.frames.get(key)
+        if hit is not None:
+            return [dict(f) for f in hit[0]], hit[1].copy(), {"cache": time.perf_counter() - t0}
+
+    timings = {}
+    bgr = bytes_to_bgr(image_bytes)
+    if cache is not None:
+        signature = cache.frame_signature(bgr)
+        similar = cache.get_similar(signature, len(face_index), *params)
+        if similar is not None:
+            for f in similar:
+                draw_face_box(bgr, f["location"], f["recognized"], f["name"], f["id_no"])
+            cache.frames.put(key, (similar, bgr.copy()))
+            return [dict(f) for f in similar], bgr, {"similar_cache": time.perf_counter() - t0}
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    t1 = time.perf_counter()
+    face_locations, detection = detect_faces(rgb, detector=detector, scale=scale)
+    t2 = time.perf_counter()
+    face_encodings = fr.face_encodings(rgb, face_locations)
+    t3 = time.perf_counter()
+    best_indices, best_distances = match_encodings(face_index, face_encodings, tolerance, cache)
+    t4 = time.perf_counter()
+    timings.update(decode=t1 - t0, detect=t2 - t1, encode=t3 - t2, match=t4 - t3)
+
+    faces = []
+    for location, idx, dist in zip(face_locations, best_indices, best_distances):
+        recognized = idx >= 0
+        name = known_names[idx] if recognized else "Unknown"
+        id_no = known_ids[idx] if recognized else "N/A"
+        faces.append({"recognized": bool(recognized), "name": name, "id_no": id_no,
+                      "distance": float(dist) if recognized else None, "location": location,
+                      "detector": detection["detector"], "scale": detection["scale"]})
+        draw_face_box(bgr, location, recognized, name, id_no)
+
+    if cache is not None:
+        cache.frames.put(key, ([dict(f) for f in faces], bgr.copy()))
+        cache.put_similar(signature, len(face_index), params, [dict(f) for f in faces])
+    return faces, bgr, timings
+
+# ------------------ Video stream ------------------
+def parse_video_source(source: str):
+    """Camera index ("0"), RTSP/HTTP URL or video file path for cv2.VideoCapture."""
+    source = source.strip()
+    return int(source) if source.isdigit() else source
+
+def stream_attendance(source, face_index, known_names, known_ids, attendance_store,
+                      detect_every: int = 5, scale: float = 0.5, tolerance: float = 0.4, max_attempts: int = 3,
+                      detector: str = "hog"):
+    """
+    Continuous attendance from a cv2.VideoCapture source.
+
+    Face detection runs only every `detect_every` frames (on a frame downscaled by `scale`);
+    in between, a FaceTracker moves the boxes. A face is encoded + matched only when its
+    track is new (unknown tracks are retried on up to `max_attempts` detections).
+    Yields (annotated_bgr, newly_marked [(name, id_no)], stats dict) for every frame.
+    """
+    cap = cv2.VideoCapture(parse_video_source(source) if isinstance(source, str) else source)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video source {source!r}.")
+
+    tracker = FaceTracker()
+    frame_no, encoded, t_start = 0, 0, time.perf_counter()
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            newly_marked = []
+
+            if frame_no % detect_every == 0:
+                tracker.update(detect_face_locations(frame, model=detector, scale=scale), frames_elapsed=detect_every)
+                pending = [t for t in tracker.tracks
+                           if not t.recognized and t.attempts < max_attempts and t.misses == 0]
+                if pending:
+                    encodings, _ = get_face_encodings_from_bgr(frame, locations=[t.location for t in pending])
+                    encoded += len(pending)
+                    best_indices, best_distances = face_index.match(
+                        np.asarray(encodings).reshape(-1, face_index.dim), tolerance=tolerance)
+                    for track, idx, dist in zip(pending, best_indices, best_distances):
+                        track.attempts += 1
+                        if idx >= 0:
+                            track.recognized = True
+                            track.name, track.id_no, track.distance = known_names[idx], known_ids[idx], float(dist)
+                            if mark_attendance(track.name, track.id_no, attendance_store):
+                                newly_marked.append((track.name, track.id_no))
+            else:
+                tracker.predict()
+
+            for track in tracker.tracks:
+                draw_face_box(frame, track.location, track.recognized, track.name, track.id_no)
+
+            frame_no += 1
+            stats = {"frames": frame_no, "fps": frame_no / (time.perf_counter() - t_start),
+                     "tracks": len(tracker.tracks), "encoded": encoded}
+            yield frame, newly_marked, stats
+    finally:
+        cap.release()
+
+# ------------------ Warm-up ------------------
+def warm_up(detector="hog"):
+    """
+    Load OpenCV, the dlib models and the chosen detector now instead of on the first
+    request. Returns seconds spent per step.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    cv2.load()
+    timings["import_cv2"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fr.load()    # face_recognition loads the dlib models at import
+    timings["import_face_recognition"] = time.perf_counter() - t0
+
+    # one tiny pass so dlib / OpenCV allocate their buffers up front
+    t0 = time.perf_counter()
+    blank = np.zeros((120, 120, 3), dtype=np.uint8)
+    detect_faces(blank, detector=detector)
+    fr.face_encodings(blank, [(10, 110, 110, 10)])
+    timings["first_pass"] = time.perf_counter() - t0
+    return timings
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(warm_up(), indent=2))
@@ -0,0 +1,221 @@
+import threading
+
+import numpy as np
+
+ENCODING_DIM = 128   # face_recognition (dlib) encodings are 128-d vectors
+
+
+class FaceIndex:
+    """
+    In-memory nearest-neighbour index over face encodings.
+
+    All encodings live in one contiguous float32 (N, 128) matrix with their
+    squared norms precomputed, so a batch of probes is matched against the
+    whole roster with a single matrix product instead of the per-call list
+    scans done by fr.compare_faces / fr.face_distance.
+    Distances are Euclidean, same as fr.face_distance, so the existing
+    tolerance values keep their meaning.
+
+    nlist > 0 turns on the partitioned (IVF) mode: encodings are grouped
+    around nlist k-means centroids and a query only scans the nprobe closest
+    groups. Worth it only for very large rosters (tens of thousands+).
+
+    Thread-safe: add / sync / train run under a lock, and a search works on a
+    snapshot of the arrays taken under that lock (writers replace arrays or only
+    write rows past the snapshot's size), so it never sees a matrix and norms
+    from different states.
+    """
+
+    def __init__(self, encodings=None, dim=ENCODING_DIM, nlist=0, nprobe=4):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._size = 0
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._centroids = None      # (nlist, dim) once trained
+        self._lists = None          # inverted lists: row ids per partition once trained
+        self._lock = threading.RLock()
+        if encodings is not None and len(encodings):
+            self.add(encodings)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def encodings(self):
+        """(N, dim) float32 view of the stored encodings."""
+        return self._matrix[:self._size]
+
+    # ------------------ Building ------------------
+    def _as_matrix(self, encodings):
+        mat = np.ascontiguousarray(encodings, dtype=np.float32)
+        if mat.ndim == 1:
+            mat = mat.reshape(1, -1)
+        if mat.shape[1] != self.dim:
+            raise ValueError(f"Expected encodings of size {self.dim}, got {mat.shape[1]}.")
+        return mat
+
+    def add(self, encodings):
+        """Append one encoding or an (M, dim) batch; returns the new row indices."""
+        new = self._as_matrix(encodings)
+        with self._lock:
+            return self._add(new)
+
+    def _add(self, new):
+        start, end = self._size, self._size + len(new)
+
+        # grow capacity geometrically so repeated registrations stay amortized O(1)
+        if end > len(self._matrix):
+            capacity = max(end, 2 * len(self._matrix), 64)
+            matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            matrix[:start] = self._matrix[:start]
+            sq_norms = np.empty(capacity, dtype=np.float32)
+            sq_norms[:start] = self._sq_norms[:start]
+            self._matrix, self._sq_norms = matrix, sq_norms
+
+        self._matrix[start:end] = new
+        self._sq_norms[start:end] = np.einsum("ij,ij->i", new, new)
+        self._size = end
+
+        self._partition_new(new, start)
+        return np.arange(start, end)
+
+    def sync(self, matrix):
+        """
+        Adopt a matrix whose first len(self) rows are the rows already indexed
+        (e.g. the memory-mapped FaceStore.encodings after a refresh). The matrix
+        is referenced, not copied; only norms / partitions of the new tail are computed.
+        """
+        matrix = self._as_matrix(matrix)
+        with self._lock:
+            return self._sync(matrix)
+
+    def _sync(self, matrix):
+        start = self._size
+        if len(matrix) <= start:
+            return np.arange(0)
+        new = matrix[start:]
+        self._sq_norms = np.concatenate([self._sq_norms[:start], np.einsum("ij,ij->i", new, new)])
+        self._matrix = matrix
+        self._size = len(matrix)
+
+        self._partition_new(new, start)
+        return np.arange(start, self._size)
+
+    def _partition_new(self, new, start):
+        """Append freshly added rows to their IVF lists (training the quantizer once there is enough data)."""
+        if self._centroids is not None:
+            assign = self._nearest_centroids(new, 1)[:, 0]
+            lists = list(self._lists)           # new list object: snapshots keep the old one
+            for c in np.unique(assign):
+                lists[c] = np.concatenate([lists[c], start + np.flatnonzero(assign == c)])
+            self._lists = lists
+        elif self.nlist and self._size >= 8 * self.nlist:
+            self.train()
+
+    def train(self, n_iter=10, sample_size=50_000, seed=0):
+        """Fit the IVF coarse quantizer (plain k-means) and partition all rows."""
+        with self._lock:
+            self._train(n_iter, sample_size, seed)
+
+    def _train(self, n_iter, sample_size, seed):
+        if not self.nlist or self._size < self.nlist:
+            return
+        data = self.encodings
+        rng = np.random.default_rng(seed)
+        if self._size > sample_size:
+            sample = data[rng.choice(self._size, sample_size, replace=False)]
+        else:
+            sample = data
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            labels = _argmin_sq_dist(sample, centroids)
+            for c in range(self.nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        assign = _nearest_centroids(data, centroids, 1)[:, 0]
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(self.nlist + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(self.nlist)]
+        self._centroids = centroids
+
+    def _nearest_centroids(self, probes, n):
+        return _nearest_centroids(probes, self._centroids, n)
+
+    # ------------------ Querying ------------------
+    def search(self, probes, k=1):
+        """
+        Top-k nearest neighbours for a batch of probe encodings.
+        Returns (distances, indices), both shaped (M, k) and sorted by distance.
+        Missing neighbours (k > N, or empty IVF lists) are inf / -1.
+        """
+        probes = self._as_matrix(probes)
+        with self._lock:
+            matrix, sq_norms, size = self._matrix, self._sq_norms, self._size
+            centroids, inverted = self._centroids, self._lists
+        m = len(probes)
+        distances = np.full((m, k), np.inf, dtype=np.float32)
+        indices = np.full((m, k), -1, dtype=np.int64)
+        if size == 0 or m == 0:
+            return distances, indices
+
+        if centroids is None:
+            d2 = _sq_dist(probes, matrix[:size], sq_norms[:size])
+            top_d, top_i = _topk(d2, k)
+            distances[:, :top_d.shape[1]] = top_d
+            indices[:, :top_i.shape[1]] = top_i
+            return np.sqrt(distances), indices
+
+        # IVF: scan only the rows whose partition is among the nprobe closest
+        probe_lists = _nearest_centroids(probes, centroids, self.nprobe)
+        for row, lists in enumerate(probe_lists):
+            candidates = np.concatenate([inverted[c] for c in lists])
+            if len(candidates) == 0:
+                continue
+            d2 = _sq_dist(probes[row:row + 1], matrix[candidates], sq_norms[candidates])
+            top_d, top_i = _topk(d2, k)
+            distances[row, :top_d.shape[1]] = top_d[0]
+            indices[row, :top_i.shape[1]] = candidates[top_i[0]]
+        return np.sqrt(distances), indices
+
+    def match(self, probes, tolerance=0.4):
+        """
+        Best match per probe within tolerance.
+        Returns (indices, distances); index is -1 where nothing is within tolerance.
+        """
+        distances, indices = self.search(probes, k=1)
+        distances, indices = distances[:, 0], indices[:, 0]
+        indices = np.where(distances <= tolerance, indices, -1)
+        return indices, distances
+
+
+def _sq_dist(probes, matrix, sq_norms):
+    """Squared euclidean distances (M, N) via ||p||^2 + ||x||^2 - 2 p.x"""
+    d2 = sq_norms[None, :] - 2.0 * (probes @ matrix.T)
+    d2 += np.einsum("ij,ij->i", probes, probes)[:, None]
+    np.maximum(d2, 0.0, out=d2)    # rounding can push exact matches slightly below 0
+    return d2
+
+
+def _nearest_centroids(probes, centroids, n):
+    d = _sq_dist(probes, centroids, np.einsum("ij,ij->i", centroids, centroids))
+    n = min(n, len(centroids))
+    return np.argsort(d, axis=1)[:, :n]
+
+
+def _argmin_sq_dist(probes, matrix):
+    return np.argmin(_sq_dist(probes, matrix, np.einsum("ij,ij->i", matrix, matrix)), axis=1)
+
+
+def _topk(d2, k):
+    """Smallest k entries per row of d2, sorted ascending."""
+    k = min(k, d2.shape[1])
+    if k < d2.shape[1]:
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(d2.shape[1]), d2.shape)
+    part_d = np.take_along_axis(d2, part, axis=1)
+    order = np.argsort(part_d, axis=1)
+    return np.take_along_axis(part_d, order, axis=1), np.take_along_axis(part, order, axis=1)
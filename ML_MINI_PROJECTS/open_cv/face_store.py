@@ -0,0 +1,185 @@
+import contextlib
+import csv
+import io
+import os
+import struct
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+# ------------------ On-disk layout ------------------
+# <root>/encodings.bin : fixed 32-byte header followed by raw float32 rows (count x dim)
+# <root>/people.csv    : one "id,name" row per encoding, same order, append-only
+# <root>/store.lock    : held exclusively by the one process appending at a time
+#
+# Writers append the sidecar row and the encoding row first (both fsynced) and bump
+# `count` in the header last, so a reader that trusts the header never sees a
+# half-written entry. Readers take no lock.
+MAGIC = b"FACEDB\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")   # magic, version, dim, count, generation
+HEADER_SIZE = 32
+ENCODINGS_FILE = "encodings.bin"
+PEOPLE_FILE = "people.csv"
+LOCK_FILE = "store.lock"
+
+
+class FaceStore:
+    """
+    Append-only face database: a memory-mapped float32 encodings matrix plus an
+    ID/name sidecar table.
+
+    The encodings are exposed as a read-only np.memmap, so every session (and
+    every process on the host) shares the same OS page cache instead of holding
+    its own unpickled copy. Appends from several processes (the app and
+    bulk_register.py, say) are serialized by an exclusive lock on store.lock;
+    refresh() picks up rows appended by other writers by reading only the new tail.
+    """
+
+    def __init__(self, root, dim=128):
+        self.root = root
+        self.dim = dim
+        self.enc_path = os.path.join(root, ENCODINGS_FILE)
+        self.people_path = os.path.join(root, PEOPLE_FILE)
+        self.lock_path = os.path.join(root, LOCK_FILE)
+        self.generation = 0
+        self.names, self.ids = [], []
+        self.row_of_id = {}
+        self._encodings = np.empty((0, dim), dtype=np.float32)
+        self._people_offset = 0
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+
+        os.makedirs(root, exist_ok=True)
+        with self.writer_lock():
+            if not os.path.exists(self.enc_path):
+                open(self.people_path, "w").close()
+                with open(self.enc_path, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, dim, 0, 0).ljust(HEADER_SIZE, b"\0"))
+        self.refresh()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def encodings(self):
+        """(N, dim) read-only float32 view of all committed encodings."""
+        return self._encodings
+
+    @contextlib.contextmanager
+    def writer_lock(self):
+        """
+        Exclusive across threads (RLock) and processes (lock on store.lock); re-entrant,
+        so a caller can hold it around a check-then-append() sequence.
+        """
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_path, "a+b") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # ------------------ Reading ------------------
+    def _read_header(self):
+        with open(self.enc_path, "rb") as f:
+            magic, version, dim, count, generation = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.enc_path} is not a face store file.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported face store version {version} (expected {FORMAT_VERSION}).")
+        if dim != self.dim:
+            raise ValueError(f"Face store holds {dim}-d encodings, expected {self.dim}.")
+        return count, generation
+
+    def refresh(self):
+        """Load entries committed since the last refresh; returns how many were new."""
+        with self._lock:
+            count, generation = self._read_header()
+            if generation == self.generation and count == len(self.ids):
+                return 0
+            return self._load_tail(count, generation)
+
+    def _load_tail(self, count, generation):
+        # A header ahead of the data (left by a crash, or by a writer predating the lock)
+        # is clamped to the rows that are complete in both files; the next append
+        # overwrites the orphaned tail and commits a consistent count again.
+        count = min(count, (os.path.getsize(self.enc_path) - HEADER_SIZE) // (4 * self.dim))
+        start = len(self.ids)
+        with open(self.people_path, "rb") as f:
+            f.seek(self._people_offset)
+            while len(self.ids) < count:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                row = next(csv.reader([line.decode("utf-8")]))
+                if len(row) != 2:
+                    raise ValueError(f"{self.people_path}: row {len(self.ids) + 1} is not 'id,name' ({line!r}).")
+                id_no, name = row
+                self.row_of_id[id_no] = len(self.ids)
+                self.ids.append(id_no)
+                self.names.append(name)
+                self._people_offset = f.tell()
+
+        if len(self.ids):
+            self._encodings = np.memmap(self.enc_path, dtype=np.float32, mode="r",
+                                        offset=HEADER_SIZE, shape=(len(self.ids), self.dim))
+        self.generation = generation
+        return len(self.ids) - start
+
+    # ------------------ Writing ------------------
+    def append(self, encodings, names, ids):
+        """Append a batch of entries with a single commit; returns the new row indices."""
+        mat = np.ascontiguousarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        if not (len(mat) == len(names) == len(ids)):
+            raise ValueError("encodings, names and ids must have the same length.")
+
+        with self.writer_lock():
+            self.refresh()      # under the lock: rows committed by other processes are counted in
+            start = len(self.ids)
+
+            rows = io.StringIO(newline="")
+            csv.writer(rows).writerows(zip(ids, names))
+            with open(self.people_path, "r+b") as f:
+                f.seek(self._people_offset)
+                f.truncate()    # drop rows left behind by an interrupted, uncommitted append
+                f.write(rows.getvalue().encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            with open(self.enc_path, "r+b") as f:
+                f.seek(HEADER_SIZE + start * self.dim * 4)
+                f.write(mat.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+                # commit: header is rewritten only once the rows are on disk
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.dim, start + len(mat), self.generation + 1))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.refresh()
+        return np.arange(start, start + len(mat))
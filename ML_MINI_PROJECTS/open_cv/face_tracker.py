@@ -0,0 +1,85 @@
+import itertools
+
+# Boxes use face_recognition's (top, right, bottom, left) order throughout.
+
+
+def iou(a, b):
+    """Intersection-over-union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+class Track:
+    """One face followed across frames, plus the identity it was matched to."""
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = tuple(float(v) for v in box)
+        self.detected_box = self.box            # last box that came from the detector
+        self.velocity = (0.0, 0.0, 0.0, 0.0)   # per-frame box delta, from the last two detections
+        self.misses = 0
+        self.attempts = 0                       # how many times it has been encoded + matched
+        self.recognized = False
+        self.name, self.id_no, self.distance = "Unknown", "N/A", None
+
+    @property
+    def location(self):
+        return tuple(int(round(v)) for v in self.box)
+
+
+class FaceTracker:
+    """
+    Cheap IoU tracker used between (expensive) face detections.
+
+    On detection frames, update() associates the new boxes with existing tracks
+    by greedy IoU; between detections, predict() moves every box along its
+    last observed velocity. Only tracks returned by update() as new need encoding.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=2):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def predict(self, frames=1):
+        for t in self.tracks:
+            t.box = tuple(b + frames * v for b, v in zip(t.box, t.velocity))
+
+    def update(self, boxes, frames_elapsed=1):
+        """
+        Associate detected boxes with current tracks.
+        Returns the list of tracks created for boxes that matched nothing.
+        """
+        pairs = sorted(((iou(t.box, b), ti, bi) for ti, t in enumerate(self.tracks)
+                        for bi, b in enumerate(boxes)), reverse=True)
+        matched_tracks, matched_boxes = set(), set()
+        for score, ti, bi in pairs:
+            if score < self.iou_threshold:
+                break
+            if ti in matched_tracks or bi in matched_boxes:
+                continue
+            matched_tracks.add(ti)
+            matched_boxes.add(bi)
+            track = self.tracks[ti]
+            new_box = tuple(float(v) for v in boxes[bi])
+            track.velocity = tuple((n - o) / max(frames_elapsed, 1) for n, o in zip(new_box, track.detected_box))
+            track.box = track.detected_box = new_box
+            track.misses = 0
+
+        survivors = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+                track.velocity = (0.0, 0.0, 0.0, 0.0)
+            if track.misses <= self.max_misses:
+                survivors.append(track)
+
+        new_tracks = [Track(next(self._ids), b) for bi, b in enumerate(boxes) if bi not in matched_boxes]
+        self.tracks = survivors + new_tracks
+        return new_tracks
@@ -0,0 +1,23 @@
+import importlib
+
+
+class lazy_module:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+        cv2 = lazy_module("cv2")   # nothing imported yet
+        cv2.imdecode(...)           # imports cv2 here
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import now (if not done yet) and return the real module."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
@@ -0,0 +1,149 @@
+import collections
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire `ttl` seconds after insertion."""
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, accept=None):
+        """Value for key if it is live (and accept(value) is true, when given), else None."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and time.monotonic() - item[1] > self.ttl:
+                del self._data[key]
+                item = None
+            if item is not None and (accept is None or accept(item[0])):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+            return None
+
+    def find(self, accept):
+        """Most recently used live value for which accept(value) is true (linear scan), else None."""
+        with self._lock:
+            self._expire()
+            for key in reversed(self._data):
+                value = self._data[key][0]
+                if accept(value):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in [k for k, (_, t) in self._data.items() if now - t > self.ttl]:
+            del self._data[key]
+
+    def __len__(self):
+        with self._lock:
+            self._expire()
+            return len(self._data)
+
+
+class RecognitionCache:
+    """
+    Three-level cache in front of recognition for repeated captures.
+
+      frame level    : hash of the raw image bytes -> full recognition result
+                       (identical re-submits skip decode, detection and encoding)
+      similar frames : 32x32 grayscale thumbnail of the decoded frame -> full result.
+                       A new frame of the same size whose thumbnail differs from a
+                       cached one by at most `near_frame` grey levels in every block
+                       (same scene, only sensor / JPEG noise) skips detection and
+                       encoding; the cached boxes are drawn onto the new frame.
+      encoding level : sign-quantized random projection of the face encoding
+                       (an LSH bucket) -> (index, distance) match. A hit is only
+                       used if the cached encoding is within `near_dup` of the
+                       probe, so a bucket collision never returns someone else.
+
+    Keys include the roster size, so registering someone new never serves a
+    stale "Unknown".
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0, near_dup=0.06, near_frame=4.0, n_bits=16, dim=128):
+        self.near_dup = near_dup
+        self.near_frame = near_frame
+        self.frames = TTLCache(max_entries, ttl)
+        self.similar_frames = TTLCache(max_entries, ttl)
+        self.matches = TTLCache(max_entries * 8, ttl)
+        self._planes = np.random.default_rng(0).normal(size=(dim, n_bits)).astype(np.float32)
+
+    @staticmethod
+    def frame_key(image_bytes, roster_size, *params):
+        return hashlib.blake2b(image_bytes, digest_size=16).digest(), roster_size, params
+
+    # ------------------ Similar frames ------------------
+    @staticmethod
+    def frame_signature(bgr, size=32):
+        """(frame shape, size x size block means of the 2x subsampled grayscale frame)."""
+        gray = bgr[::2, ::2]
+        gray = gray.mean(axis=2, dtype=np.float32) if gray.ndim == 3 else gray.astype(np.float32)
+        h, w = gray.shape
+        rows = np.linspace(0, h, min(size, h) + 1).astype(int)
+        cols = np.linspace(0, w, min(size, w) + 1).astype(int)
+        sums = np.add.reduceat(np.add.reduceat(gray, rows[:-1], axis=0), cols[:-1], axis=1)
+        return bgr.shape, sums / np.outer(np.diff(rows), np.diff(cols))
+
+    def get_similar(self, signature, roster_size, *params):
+        """Cached result of a near-identical frame of the same size (see the class docstring), or None."""
+        meta = (signature[0], roster_size, params)
+        thumb = signature[1]
+
+        def close(entry):
+            return entry[0] == meta and float(np.abs(entry[1] - thumb).max()) <= self.near_frame
+
+        entry = self.similar_frames.find(close)
+        return None if entry is None else entry[2]
+
+    def put_similar(self, signature, roster_size, params, result):
+        shape, thumb = signature
+        key = hashlib.blake2b(thumb.tobytes(), digest_size=16).digest(), shape, roster_size, params
+        self.similar_frames.put(key, ((shape, roster_size, params), thumb, result))
+
+    # ------------------ Encodings ------------------
+    def encoding_key(self, encoding, roster_size, tolerance):
+        bits = np.packbits(np.asarray(encoding, dtype=np.float32) @ self._planes > 0)
+        return bits.tobytes(), roster_size, tolerance
+
+    def get_match(self, encoding, roster_size, tolerance):
+        """Cached (index, distance) for a near-identical encoding, or None."""
+        encoding = np.asarray(encoding, dtype=np.float32)
+        # same bucket but not the same face counts as a miss
+        item = self.matches.get(self.encoding_key(encoding, roster_size, tolerance),
+                                accept=lambda item: np.linalg.norm(item[0] - encoding) <= self.near_dup)
+        return None if item is None else item[1]
+
+    def put_match(self, encoding, roster_size, tolerance, index, distance):
+        encoding = np.asarray(encoding, dtype=np.float32)
+        self.matches.put(self.encoding_key(encoding, roster_size, tolerance),
+                         (encoding, (int(index), float(distance))))
+
+    def stats(self):
+        out = {}
+        for level, cache in (("frame", self.frames), ("similar frame", self.similar_frames),
+                             ("encoding", self.matches)):
+            total = cache.hits + cache.misses
+            out[level] = {"hits": cache.hits, "misses": cache.misses, "size": len(cache),
+                          "hit_rate": cache.hits / total if total else 0.0}
+        return out
@@ -0,0 +1,88 @@
+import csv
+import time
+from datetime import datetime
+
+import pytest
+
+from attendance_store import AttendanceStore
+
+MORNING = datetime(2024, 5, 6, 9, 0, 0)
+LATER = datetime(2024, 5, 6, 17, 30, 0)
+NEXT_DAY = datetime(2024, 5, 7, 9, 0, 0)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "attendance.db")
+
+
+def test_marks_once_per_day(db_path):
+    store = AttendanceStore(db_path, flush_interval=3600)
+    assert store.mark("Ann", "E1", MORNING)
+    assert not store.mark("Ann", "E1", LATER)
+    assert store.mark("Ann", "E1", NEXT_DAY)
+    added = store.mark_many([("Ann", "E1"), ("Bob", "E2"), ("Bob", "E2")], LATER)
+    assert added == [("Bob", "E2")]
+    assert store.marked_ids("2024-05-06") == {"E1", "E2"}
+    store.close()
+
+
+def test_flush_writes_buffer_and_reports_read_it(db_path):
+    store = AttendanceStore(db_path, flush_interval=3600)
+    store.mark_many([("Ann", "E1"), ("Bob", "E2")], MORNING)
+    assert store._buffer
+    store.flush()
+    assert not store._buffer
+    assert store.records("2024-05-06") == [("Ann", "E1", "2024-05-06", "09:00:00"),
+                                           ("Bob", "E2", "2024-05-06", "09:00:00")]
+    assert store.records("2024-05-07") == []
+    store.close()
+
+
+def test_close_flushes_and_reopen_keeps_dedupe(db_path):
+    store = AttendanceStore(db_path, flush_interval=3600)
+    store.mark("Ann", "E1", MORNING)
+    store.close()
+    assert not store._flusher.is_alive()
+
+    reopened = AttendanceStore(db_path, flush_interval=3600)
+    assert reopened.is_marked("E1", "2024-05-06")
+    assert not reopened.mark("Ann", "E1", LATER)
+    assert reopened.records("2024-05-06", "2024-05-07") == [("Ann", "E1", "2024-05-06", "09:00:00")]
+    reopened.close()
+
+
+def test_full_buffer_wakes_the_flusher(db_path):
+    store = AttendanceStore(db_path, flush_interval=3600, max_buffer=2)
+    store.mark_many([("Ann", "E1"), ("Bob", "E2")], MORNING)
+    deadline = time.monotonic() + 2.0     # flush_interval is an hour; only the wake-up can flush this soon
+    while store._buffer and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not store._buffer
+    store.close()
+
+
+def test_legacy_csv_import_and_export(db_path, tmp_path):
+    legacy = tmp_path / "attendance.csv"
+    legacy.write_text("Name,ID,Date,Time\nAnn,E1,2024-05-06,09:00:00\nAnn,E1,2024-05-06,10:00:00\n")
+    store = AttendanceStore(db_path, flush_interval=3600)
+    assert store.is_empty()
+    assert store.import_csv(str(legacy)) == 1
+    assert not store.mark("Ann", "E1", LATER)
+
+    out = tmp_path / "export.csv"
+    store.export_csv(str(out), "2024-05-06")
+    with open(out, newline="") as f:
+        assert list(csv.reader(f)) == [["Name", "ID", "Date", "Time"], ["Ann", "E1", "2024-05-06", "09:00:00"]]
+    store.close()
+
+
+def test_past_day_marked_twice_before_flushing(db_path):
+    store = AttendanceStore(db_path, flush_interval=3600)
+    past = datetime(2024, 5, 1, 9, 0, 0)
+    assert store.mark("Ada", "1", past)
+    for day in (6, 7, 8):                       # pushes 2024-05-01 out of the in-memory days
+        store.mark("Bob", "2", datetime(2024, 5, day, 9, 0, 0))
+    assert not store.mark("Ada", "1", past)
+    assert store.records("2024-05-01") == [("Ada", "1", "2024-05-01", "09:00:00")]
+    store.close()
@@ -0,0 +1,25 @@
+import numpy as np
+
+from bulk_register import _earlier_neighbours
+
+
+def test_earlier_neighbours_matches_brute_force_across_blocks():
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, 0.09, (40, 128)).astype(np.float32)
+    # every face appears several times with small noise, shuffled through the batch
+    batch = np.vstack([base, base + rng.normal(0, 0.01, base.shape), base[:10]]).astype(np.float32)
+    batch = batch[rng.permutation(len(batch))]
+    d = np.linalg.norm(batch[:, None].astype(np.float64) - batch[None], axis=2)
+
+    found = list(_earlier_neighbours(batch, tolerance=0.4, block=7))
+    assert len(found) == len(batch)
+    for i, near in enumerate(found):
+        expected = np.flatnonzero(d[i, :i] <= 0.4)
+        assert sorted(near) == sorted(expected)
+        assert list(d[i, near]) == sorted(d[i, near])
+
+
+def test_every_earlier_duplicate_is_reported_not_just_the_nearest_few():
+    face = np.random.default_rng(1).normal(0, 0.09, 128).astype(np.float32)
+    batch = np.tile(face, (20, 1))
+    assert len(list(_earlier_neighbours(batch, tolerance=0.4))[-1]) == 19
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from face_detection import detect_faces
+
+FRAME = np.zeros((10, 10, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("scale", [0, -0.5, float("nan")])
+def test_non_positive_scale_is_rejected(scale):
+    with pytest.raises(ValueError, match="scale"):
+        detect_faces(FRAME, scale=scale)
+
+
+def test_unknown_detector_is_rejected():
+    with pytest.raises(ValueError, match="detector"):
+        detect_faces(FRAME, detector="yolo")
@@ -0,0 +1,19 @@
+import pickle
+
+import numpy as np
+
+from face_engine import open_face_db, refresh_face_db
+
+
+def test_legacy_pickle_is_imported_once_before_other_writers(tmp_path):
+    legacy = tmp_path / "face_data.pkl"
+    enc = np.random.default_rng(0).normal(0, 0.09, (2, 128)).astype(np.float32)
+    with open(legacy, "wb") as f:
+        pickle.dump((list(enc), ["Ann", "Bob"], ["E1", "E2"]), f)
+
+    store, index = refresh_face_db(*open_face_db(str(tmp_path / "db"), str(legacy)))
+    assert store.ids == ["E1", "E2"] and len(index) == 2
+    np.testing.assert_array_equal(store.encodings, enc)
+
+    again, _ = open_face_db(str(tmp_path / "db"), str(legacy))    # not imported a second time
+    assert again.ids == ["E1", "E2"]
@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pytest
+
+from face_index import FaceIndex
+
+
+def brute_force(db, probes, k):
+    d = np.linalg.norm(probes[:, None, :].astype(np.float64) - db[None, :, :], axis=2)
+    order = np.argsort(d, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(d, order, axis=1), order
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    db = (rng.standard_normal((2000, 128)) * 0.09).astype(np.float32)
+    probes = db[rng.choice(len(db), 25, replace=False)] + rng.normal(0, 0.01, (25, 128)).astype(np.float32)
+    return db, probes
+
+
+def test_exact_search_matches_brute_force(data):
+    db, probes = data
+    dist, idx = FaceIndex(db).search(probes, k=5)
+    ref_dist, ref_idx = brute_force(db, probes, 5)
+    np.testing.assert_array_equal(idx, ref_idx)
+    np.testing.assert_allclose(dist, ref_dist, atol=1e-4)
+
+
+def test_incremental_add_and_sync_match_bulk_build(data):
+    db, probes = data
+    added = FaceIndex()
+    for start in range(0, len(db), 300):
+        added.add(db[start:start + 300])
+    synced = FaceIndex()
+    synced.sync(db[:500])
+    synced.sync(db)
+    bulk = FaceIndex(db)
+    for index in (added, synced):
+        assert len(index) == len(db)
+        np.testing.assert_array_equal(index.search(probes, k=3)[1], bulk.search(probes, k=3)[1])
+
+
+def test_ivf_with_all_lists_probed_is_exact(data):
+    db, probes = data
+    ivf = FaceIndex(db, nlist=16, nprobe=16)
+    ivf.train()
+    ref_dist, ref_idx = brute_force(db, probes, 3)
+    dist, idx = ivf.search(probes, k=3)
+    np.testing.assert_array_equal(idx, ref_idx)
+    np.testing.assert_allclose(dist, ref_dist, atol=1e-4)
+
+
+def test_ivf_finds_near_duplicates_and_keeps_partitioning_new_rows(data):
+    db, probes = data
+    ivf = FaceIndex(db[:1500], nlist=16, nprobe=4)
+    assert ivf._centroids is not None            # trained automatically once 8 * nlist rows exist
+    ivf.add(db[1500:])
+    assert sum(len(rows) for rows in ivf._lists) == len(db)
+    idx, dist = ivf.match(probes, tolerance=0.4)
+    np.testing.assert_array_equal(idx, brute_force(db, probes, 1)[1][:, 0])
+
+
+def test_match_tolerance_and_missing_neighbours():
+    index = FaceIndex(np.zeros((2, 128), dtype=np.float32))
+    far = np.full((1, 128), 0.1, dtype=np.float32)           # distance ~1.13
+    idx, dist = index.match(far, tolerance=0.4)
+    assert idx[0] == -1 and dist[0] > 0.4
+    dist, idx = index.search(far, k=4)
+    assert list(idx[0, 2:]) == [-1, -1] and np.isinf(dist[0, 2:]).all()
+    assert FaceIndex().match(far)[0][0] == -1
+
+
+def test_wrong_dimension_is_rejected():
+    with pytest.raises(ValueError):
+        FaceIndex().add(np.zeros((1, 64), dtype=np.float32))
+
+
+@pytest.mark.parametrize("nlist", [0, 4])
+def test_search_during_sync_sees_a_consistent_index(nlist):
+    rng = np.random.default_rng(3)
+    data = rng.normal(size=(1500, 128)).astype(np.float32)
+    index = FaceIndex(data[:100], nlist=nlist)
+    errors = []
+
+    def search():
+        try:
+            for _ in range(50):
+                probes = data[:50]
+                distances, indices = index.search(probes, k=1)
+                assert (indices[:, 0] == np.arange(50)).all()
+                assert np.allclose(distances[:, 0], 0, atol=1e-2)
+        except Exception as e:      # surfaced below: assertion errors in threads are lost otherwise
+            errors.append(e)
+
+    readers = [threading.Thread(target=search) for _ in range(3)]
+    for t in readers:
+        t.start()
+    for end in range(200, 1501, 100):
+        index.sync(data[:end].copy())
+    for t in readers:
+        t.join()
+    assert errors == []
+    assert len(index) == 1500
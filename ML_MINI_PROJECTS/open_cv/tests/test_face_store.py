@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from face_store import HEADER, MAGIC, FORMAT_VERSION, FaceStore
+
+
+def encodings(n, seed):
+    return np.random.default_rng(seed).normal(0, 0.09, (n, 128)).astype(np.float32)
+
+
+def test_append_and_reopen(tmp_path):
+    store = FaceStore(str(tmp_path))
+    assert len(store) == 0 and store.encodings.shape == (0, 128)
+    first, second = encodings(3, 0), encodings(2, 1)
+    assert list(store.append(first, ["Ann", "Bob, Jr.", "Cy"], ["E1", "E2", "E3"])) == [0, 1, 2]
+    assert list(store.append(second, ["Di", "Ed"], ["E4", "E5"])) == [3, 4]
+
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.names == ["Ann", "Bob, Jr.", "Cy", "Di", "Ed"]
+    assert reopened.ids == ["E1", "E2", "E3", "E4", "E5"]
+    assert reopened.row_of_id["E4"] == 3
+    np.testing.assert_array_equal(reopened.encodings, np.vstack([first, second]))
+    assert not reopened.encodings.flags.writeable
+
+
+def test_refresh_picks_up_other_writers(tmp_path):
+    reader, writer = FaceStore(str(tmp_path)), FaceStore(str(tmp_path))
+    writer.append(encodings(2, 0), ["Ann", "Bob"], ["E1", "E2"])
+    assert len(reader) == 0
+    assert reader.refresh() == 2
+    assert reader.refresh() == 0
+    writer.append(encodings(1, 1), ["Cy"], ["E3"])
+    assert reader.refresh() == 1
+    assert reader.ids == ["E1", "E2", "E3"]
+    np.testing.assert_array_equal(reader.encodings, writer.encodings)
+
+
+def test_append_validates_lengths_and_dimension(tmp_path):
+    store = FaceStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.append(encodings(2, 0), ["Ann"], ["E1", "E2"])
+    with pytest.raises(ValueError):
+        FaceStore(str(tmp_path), dim=64)
+
+
+def _commit_count(store, count):
+    with open(store.enc_path, "r+b") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, store.dim, count, store.generation + 1))
+
+
+def test_header_ahead_of_sidecar_is_clamped_and_repaired(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.append(encodings(3, 0), ["Ann", "Bob", "Cy"], ["E1", "E2", "E3"])
+    # simulate a crash that committed the header before the sidecar rows reached disk
+    with open(store.people_path, "rb+") as f:
+        lines = f.readlines()
+        f.seek(0)
+        f.truncate()
+        f.writelines(lines[:2])
+        f.write(lines[2][:3])           # half-written third row
+    _commit_count(store, 3)
+
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.ids == ["E1", "E2"]
+    assert reopened.encodings.shape == (2, 128)
+
+    reopened.append(encodings(1, 5), ["Di"], ["E4"])
+    repaired = FaceStore(str(tmp_path))
+    assert repaired.ids == ["E1", "E2", "E4"]
+    np.testing.assert_array_equal(repaired.encodings[2], encodings(1, 5)[0])
+
+
+def test_header_ahead_of_encodings_is_clamped(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.append(encodings(2, 0), ["Ann", "Bob"], ["E1", "E2"])
+    _commit_count(store, 5)
+    assert FaceStore(str(tmp_path)).ids == ["E1", "E2"]
+
+
+def _append_worker(root, worker, batches):
+    store = FaceStore(root)
+    for b in range(batches):
+        ids = [f"W{worker}-{b}-{i}" for i in range(5)]
+        store.append(np.full((5, 128), worker * 1000 + b, dtype=np.float32), ids, ids)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses fork")
+def test_concurrent_process_appends_stay_aligned(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_worker, args=(str(tmp_path), w, 20)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    store = FaceStore(str(tmp_path))
+    assert len(store) == len(set(store.ids)) == 4 * 20 * 5
+    for row, id_no in enumerate(store.ids):
+        worker, batch, _ = id_no[1:].split("-")
+        assert store.encodings[row, 0] == int(worker) * 1000 + int(batch)
+
+
+def test_writer_lock_is_reentrant_around_append(tmp_path):
+    store = FaceStore(str(tmp_path))
+    with store.writer_lock():
+        store.refresh()
+        store.append(encodings(1, 0), ["Ann"], ["E1"])
+    other = FaceStore(str(tmp_path))
+    other.append(encodings(1, 1), ["Bob"], ["E2"])       # the lock was released
+    assert other.ids == ["E1", "E2"]
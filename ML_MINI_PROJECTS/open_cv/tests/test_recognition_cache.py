@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+
+from recognition_cache import RecognitionCache, TTLCache
+
+
+def test_ttl_cache_expires_and_len_counts_live_entries():
+    cache = TTLCache(max_entries=3, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 and len(cache) == 2
+    time.sleep(0.06)
+    cache.put("c", 3)
+    assert len(cache) == 1
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_rejected_lookups_count_as_misses():
+    cache = TTLCache()
+    cache.put("a", 1)
+    assert cache.get("a", accept=lambda v: v == 2) is None
+    assert cache.find(lambda v: v == 2) is None
+    assert cache.find(lambda v: v == 1) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_encoding_level_needs_a_near_identical_encoding():
+    cache = RecognitionCache()
+    enc = np.random.default_rng(0).normal(0, 0.09, 128).astype(np.float32)
+    cache.put_match(enc, 10, 0.4, 3, 0.21)
+    assert cache.get_match(enc + 0.001, 10, 0.4) == (3, np.float32(0.21))
+    assert cache.get_match(enc, 11, 0.4) is None             # someone registered meanwhile
+    far = enc.copy()
+    far[:64] += 0.02                                          # same sign pattern, distance 0.16
+    assert cache.get_match(far, 10, 0.4) is None
+    assert cache.stats()["encoding"]["hits"] == 1
+
+
+def frame(seed, h=480, w=640):
+    rng = np.random.default_rng(seed)
+    base = np.kron(rng.integers(0, 255, (12, 16, 3)), np.ones((h // 12, w // 16, 1)))
+    return base.astype(np.uint8)
+
+
+def test_similar_frames_hit_on_noise_and_miss_on_changes():
+    cache = RecognitionCache()
+    original = frame(0)
+    cache.put_similar(cache.frame_signature(original), 5, ("all", 0.4, "hog", 1.0), ["result"])
+
+    noisy = np.clip(original + np.random.default_rng(1).normal(0, 3, original.shape), 0, 255).astype(np.uint8)
+    assert cache.get_similar(cache.frame_signature(noisy), 5, "all", 0.4, "hog", 1.0) == ["result"]
+
+    changed = original.copy()
+    changed[200:280, 300:360] = 255 - changed[200:280, 300:360]     # someone else's face in one spot
+    assert cache.get_similar(cache.frame_signature(changed), 5, "all", 0.4, "hog", 1.0) is None
+    assert cache.get_similar(cache.frame_signature(original), 6, "all", 0.4, "hog", 1.0) is None
+    assert cache.get_similar(cache.frame_signature(original), 5, "all", 0.4, "haar", 1.0) is None
+    # same scene at another resolution: the cached boxes would be in the wrong coordinates
+    assert cache.get_similar(cache.frame_signature(frame(0, 240, 320)), 5, "all", 0.4, "hog", 1.0) is None
+
+
+def test_thumbnail_handles_tiny_frames():
+    shape, thumb = RecognitionCache.frame_signature(np.full((20, 10, 3), 7, dtype=np.uint8))
+    assert shape == (20, 10, 3) and thumb.shape == (10, 5) and np.allclose(thumb, 7)
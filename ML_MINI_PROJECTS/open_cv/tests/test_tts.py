@@ -0,0 +1,86 @@
+import threading
+import time
+
+from tts import SpeechQueue
+
+
+class GatedEngine:
+    """Records what it speaks; runAndWait() blocks until the test opens the gate."""
+
+    def __init__(self):
+        self.spoken = []
+        self.speaking = threading.Event()
+        self.gate = threading.Event()
+        self._text = None
+
+    def say(self, text):
+        self._text = text
+
+    def runAndWait(self):
+        self.speaking.set()
+        self.gate.wait(5)
+        self.spoken.append(self._text)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def busy_queue(**kwargs):
+    """A queue whose engine is stuck speaking 'first', so later messages wait."""
+    engine = GatedEngine()
+    queue = SpeechQueue(engine_factory=lambda: engine, **kwargs)
+    queue.say("first")
+    assert engine.speaking.wait(2)
+    return queue, engine
+
+
+def test_identical_waiting_messages_are_coalesced():
+    queue, engine = busy_queue()
+    for _ in range(3):
+        queue.say("Welcome Ada")
+    queue.say("Welcome Bob")
+    engine.gate.set()
+    assert wait_for(lambda: queue.spoken == 3)
+    assert engine.spoken == ["first", "Welcome Ada", "Welcome Bob"]
+
+
+def test_oldest_messages_are_dropped_beyond_max_pending():
+    queue, engine = busy_queue(max_pending=2)
+    for name in ["a", "b", "c", "d"]:
+        queue.say(name)
+    engine.gate.set()
+    assert wait_for(lambda: queue.spoken == 3)
+    assert engine.spoken == ["first", "c", "d"]
+    assert queue.dropped == 2
+
+
+def test_stale_messages_are_skipped():
+    queue, engine = busy_queue(max_age=0.05)
+    queue.say("too late")
+    time.sleep(0.1)
+    engine.gate.set()
+    assert wait_for(lambda: queue.dropped == 1)
+    queue.say("fresh")
+    assert wait_for(lambda: queue.spoken == 2)
+    assert engine.spoken == ["first", "fresh"]
+
+
+def test_failed_engine_init_goes_silent(caplog):
+    def broken():
+        raise RuntimeError("no audio device")
+
+    queue = SpeechQueue(engine_factory=broken)
+    assert wait_for(lambda: queue.backend == "silent")
+    queue.say("ignored")
+    assert queue.spoken == 0
+    assert "Text-to-speech disabled" in caplog.text
+
+
+def test_silent_backend_never_builds_an_engine():
+    queue = SpeechQueue(backend="silent", engine_factory=lambda: 1 / 0)
+    queue.say("hello")
+    assert queue.spoken == 0
@@ -0,0 +1,73 @@
+import collections
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+def pyttsx3_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class SpeechQueue:
+    """
+    Non-blocking text-to-speech.
+
+    say() only enqueues; a single background thread owns the TTS engine and
+    speaks messages one by one, so recognition never waits for audio playback.
+      - a message identical to one already waiting is coalesced (not queued twice)
+      - when more than `max_pending` messages wait, the oldest are dropped
+      - messages older than `max_age` seconds when their turn comes are skipped
+    backend="silent" (or a failed engine init, e.g. on a headless server) makes it a no-op.
+    engine_factory() builds the engine (anything with say() / runAndWait()) on the
+    speaking thread; it defaults to pyttsx3.
+    """
+
+    def __init__(self, backend="pyttsx3", max_pending=3, max_age=5.0, engine_factory=pyttsx3_engine):
+        self.backend = backend
+        self.engine_factory = engine_factory
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self.spoken = self.dropped = 0
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        if backend != "silent":
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def say(self, text):
+        if self.backend == "silent":
+            return
+        with self._cond:
+            if any(queued == text for queued, _ in self._pending):
+                return
+            self._pending.append((text, time.monotonic()))
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._cond.notify()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                while not self._pending:
+                    self._cond.wait()
+                text, queued_at = self._pending.popleft()
+                if time.monotonic() - queued_at <= self.max_age:
+                    return text
+                self.dropped += 1
+
+    def _run(self):
+        try:
+            engine = self.engine_factory()    # created here: pyttsx3 engines are not thread-safe
+        except Exception:
+            log.warning("Text-to-speech disabled", exc_info=True)
+            self.backend = "silent"
+            with self._cond:
+                self._pending.clear()
+            return
+        while True:
+            engine.say(self._next())
+            engine.runAndWait()
+            self.spoken += 1